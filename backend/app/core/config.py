@@ -37,6 +37,10 @@ class Settings(BaseSettings):
     FACEBOOK_APP_ID: str = Field(..., env="FACEBOOK_APP_ID")
     FACEBOOK_APP_SECRET: str = Field(..., env="FACEBOOK_APP_SECRET")
     FACEBOOK_API_VERSION: str = "v19.0"
+    # Connection pool of the shared Graph API client; raise for high-concurrency deployments
+    FACEBOOK_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=100, env="FACEBOOK_MAX_KEEPALIVE_CONNECTIONS")
+    FACEBOOK_MAX_CONNECTIONS: int = Field(default=500, env="FACEBOOK_MAX_CONNECTIONS")
+    FACEBOOK_KEEPALIVE_EXPIRY: float = Field(default=90.0, env="FACEBOOK_KEEPALIVE_EXPIRY")  # Seconds
 
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
@@ -50,6 +54,10 @@ class Settings(BaseSettings):
     DEFAULT_IMAGE_SIZE: str = "1024x1024"
     MAX_CAPTION_LENGTH: int = 2200
     MIN_CAPTION_LENGTH: int = 50
+    USE_LOCAL_SENTIMENT: bool = Field(default=True, env="USE_LOCAL_SENTIMENT")  # False = score with Gemini
+
+    # Content Optimization
+    MODEL_STATE_DIR: Optional[str] = Field(default="model_state", env="MODEL_STATE_DIR")  # One file per page; empty = don't persist
 
     # Celery
     CELERY_BROKER_URL: str = Field(default="redis://localhost:6379/0", env="CELERY_BROKER_URL")
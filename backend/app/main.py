@@ -13,6 +13,9 @@ import time
 from app.core.config import settings
 from app.core.database import create_tables, engine
 from app.routes import auth, pages, content, analytics
+from app.services.ai_content import close_ai_clients
+from app.services.facebook_api import close_graph_client, warm_up_graph_client
+from app.services.optimization import shutdown_analysis_executor
 
 # Configure logging
 logging.basicConfig(
@@ -40,12 +43,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     logger.info(f"Application started in {settings.ENVIRONMENT} environment")
     logger.info(f"Region: {settings.REGION}")
 
+    # Open the shared Graph API connection before the first request needs it
+    await warm_up_graph_client()
+
     yield
 
     # Cleanup on shutdown
     logger.info("Shutting down application...")
     await engine.dispose()
     logger.info("Database connections closed")
+    await close_ai_clients()
+    await close_graph_client()
+    logger.info("HTTP clients closed")
+    shutdown_analysis_executor()
+    logger.info("Analysis pool stopped")
 
 
 # Create FastAPI application
@@ -486,7 +486,7 @@ async def get_content_performance_analysis(
     start_date = end_date - timedelta(days=days)
 
     # Use optimization engine for analysis
-    optimizer = ContentOptimizationEngine()
+    optimizer = ContentOptimizationEngine(page_id=page_id, region=page.region)
 
     # Get post data for analysis
     posts_result = await db.execute(
@@ -306,6 +306,7 @@ async def schedule_content(
         select(FacebookPage).where(FacebookPage.id == content_item.facebook_page_id)
     )
     page = page_result.scalar_one()
+    now_utc = datetime.now(timezone.utc)
 
     # Calculate optimal posting time if not provided
     if not schedule_time:
@@ -328,7 +329,8 @@ async def schedule_content(
             region=page.region,
             existing_posts=existing_times,
             preferred_frequency_hours=page.posting_frequency_hours,
-            page_preferences=page.optimal_posting_times
+            page_preferences=page.optimal_posting_times,
+            now_utc=now_utc
         )
 
         await scheduler.close()
@@ -342,8 +344,8 @@ async def schedule_content(
         content_generation_id=content_item.id,
         posting_priority=5,
         is_optimal_time=True,
-        created_at=datetime.now(timezone.utc),
-        updated_at=datetime.now(timezone.utc)
+        created_at=now_utc,
+        updated_at=now_utc
     )
 
     db.add(scheduled_post)
@@ -383,8 +385,15 @@ async def optimize_content(
             detail="Content not found"
         )
 
+    # Get page region, which keys the page's trained models
+    page_result = await db.execute(
+        select(FacebookPage.region).where(FacebookPage.id == content_item.facebook_page_id)
+    )
+    region = page_result.scalar_one()
+
     # Use optimization engine
-    optimizer = ContentOptimizationEngine()
+    optimizer = ContentOptimizationEngine(page_id=content_item.facebook_page_id, region=region)
+    await optimizer.load_model_state()
 
     # Create features from content
     from app.services.optimization import ContentFeatures
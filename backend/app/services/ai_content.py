@@ -1,19 +1,25 @@
-import asyncio
 import json
 import httpx
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from datetime import datetime, timezone
-from PIL import Image
-import io
-import base64
+from functools import lru_cache
+from types import MappingProxyType
 
 from app.core.config import settings
 from app.models.models import RegionEnum, ContentTypeEnum
 
 
-class AIContentGenerator:
-    def __init__(self):
-        self.gemini_client = httpx.AsyncClient(
+# Process-wide API clients, shared so connections and TLS sessions are reused across requests
+_gemini_client: Optional[httpx.AsyncClient] = None
+_openai_client: Optional[httpx.AsyncClient] = None
+
+
+def get_gemini_client() -> httpx.AsyncClient:
+    """Return the shared Gemini client, creating it on first use."""
+    global _gemini_client
+
+    if _gemini_client is None or _gemini_client.is_closed:
+        _gemini_client = httpx.AsyncClient(
             base_url="https://generativelanguage.googleapis.com/v1beta",
             headers={
                 "Content-Type": "application/json",
@@ -21,7 +27,15 @@ class AIContentGenerator:
             timeout=60.0
         )
 
-        self.openai_client = httpx.AsyncClient(
+    return _gemini_client
+
+
+def get_openai_client() -> httpx.AsyncClient:
+    """Return the shared OpenAI client, creating it on first use."""
+    global _openai_client
+
+    if _openai_client is None or _openai_client.is_closed:
+        _openai_client = httpx.AsyncClient(
             base_url="https://api.openai.com/v1",
             headers={
                 "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
@@ -30,6 +44,62 @@ class AIContentGenerator:
             timeout=120.0
         )
 
+    return _openai_client
+
+
+async def close_ai_clients():
+    """Close the shared Gemini and OpenAI clients."""
+    global _gemini_client, _openai_client
+
+    if _gemini_client is not None:
+        await _gemini_client.aclose()
+        _gemini_client = None
+
+    if _openai_client is not None:
+        await _openai_client.aclose()
+        _openai_client = None
+
+
+# Text substitutions applied to generated captions, in order, per region
+_REGIONAL_REPLACEMENTS = {
+    RegionEnum.US: (),
+    RegionEnum.UK: (
+        ("$", "£"),  # Currency symbol conversion
+        # American to British English conversions
+        ("favorite", "favourite"),
+        ("color", "colour"),
+        ("center", "centre"),
+        ("awesome", "brilliant"),
+    ),
+}
+
+
+def _build_regional_adapter(replacements: Tuple[Tuple[str, str], ...]) -> Callable[[str], str]:
+    """Build a caption adapter specialised to a fixed replacement table."""
+
+    if not replacements:
+        return lambda caption: caption
+
+    def adapt(caption: str) -> str:
+        for old, new in replacements:
+            caption = caption.replace(old, new)
+        return caption
+
+    return adapt
+
+
+@lru_cache(maxsize=1)
+def _get_sentiment_analyzer():
+    """Load the VADER lexicon once per process."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+class AIContentGenerator:
+    def __init__(self):
+        self.gemini_client = get_gemini_client()
+        self.openai_client = get_openai_client()
+
         # Regional context and preferences
         self.regional_context = {
             RegionEnum.US: {
@@ -52,6 +122,20 @@ class AIContentGenerator:
             }
         }
 
+        # Prompt fragments are fixed per region, so join them once and freeze the context
+        for region, context in self.regional_context.items():
+            context["cultural_refs_top3"] = ", ".join(context["cultural_refs"][:3])
+            context["slang_top3"] = ", ".join(context["slang_terms"][:3])
+            context["slang_all"] = ", ".join(context["slang_terms"])
+            self.regional_context[region] = MappingProxyType(context)
+        self.regional_context = MappingProxyType(self.regional_context)
+
+        # One specialised caption adapter per region, so adaptation does no region branching
+        self._adapters: Dict[RegionEnum, Callable[[str], str]] = {
+            region: _build_regional_adapter(_REGIONAL_REPLACEMENTS.get(region, ()))
+            for region in RegionEnum
+        }
+
     async def generate_caption(
         self, 
         region: RegionEnum, 
@@ -121,13 +205,13 @@ class AIContentGenerator:
         - Content type: {content_type.value}
         - Length: 150-250 characters for high engagement
         - Include a call-to-action
-        - Use cultural references from: {", ".join(regional_context["cultural_refs"][:3])}
-        - Incorporate language style: {", ".join(regional_context["slang_terms"][:3])}
+        - Use cultural references from: {regional_context["cultural_refs_top3"]}
+        - Incorporate language style: {regional_context["slang_top3"]}
         - {hashtag_instruction}
 
         Cultural Context:
         - Currency: {regional_context["currency_symbol"]}
-        - Popular terms: {", ".join(regional_context["slang_terms"])}
+        - Popular terms: {regional_context["slang_all"]}
 
         Output format (JSON):
         {{
@@ -201,21 +285,9 @@ class AIContentGenerator:
     def _apply_regional_adaptations(self, caption_data: Dict, region: RegionEnum) -> Dict:
         """Apply region-specific adaptations to generated content."""
 
-        caption = caption_data["caption"]
+        caption = self._adapters[region](caption_data["caption"])
         regional_context = self.regional_context[region]
 
-        # Currency symbol conversion
-        if region == RegionEnum.UK:
-            caption = caption.replace("$", "£")
-
-        # Language adaptations
-        if region == RegionEnum.UK:
-            # American to British English conversions
-            caption = caption.replace("favorite", "favourite")
-            caption = caption.replace("color", "colour")
-            caption = caption.replace("center", "centre")
-            caption = caption.replace("awesome", "brilliant")
-
         # Add regional hashtags if none exist
         if not caption_data.get("hashtags"):
             caption_data["hashtags"] = regional_context["hashtag_style"][:2]
@@ -289,7 +361,14 @@ class AIContentGenerator:
 
     async def _analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment of generated content (-1 to 1)."""
-        # Simple sentiment analysis using Gemini
+        # Score locally with the VADER lexicon to avoid a Gemini round-trip
+        if settings.USE_LOCAL_SENTIMENT:
+            try:
+                return _get_sentiment_analyzer().polarity_scores(text)["compound"]
+            except ImportError:
+                pass
+
+        # Fallback: sentiment analysis using Gemini
         prompt = f"""
         Analyze the sentiment of this text and return only a number between -1 and 1:
         -1 = very negative
@@ -391,7 +470,5 @@ class AIContentGenerator:
         return sum(scores) if scores else 0.5
 
     async def close(self):
-        """Close HTTP clients."""
-        await self.gemini_client.aclose()
-        await self.openai_client.aclose()
+        """Release per-instance resources. The shared HTTP clients are closed on application shutdown."""
 
@@ -1,9 +1,10 @@
 import asyncio
 import httpx
 from typing import Dict, List, Optional, Any
-from datetime import datetime, timezone, timedelta
+from datetime import datetime
 import json
 import logging
+import time
 
 from app.core.config import settings
 from app.core.security import SecurityManager
@@ -12,6 +13,107 @@ from app.models.models import RegionEnum
 
 logger = logging.getLogger(__name__)
 
+# Map Facebook post metrics to our standardized format
+_POST_METRIC_MAPPING = {
+    "post_impressions": "impressions",
+    "post_impressions_unique": "reach",
+    "post_engaged_users": "engaged_users",
+    "post_clicks": "clicks",
+    "post_reactions_like_total": "likes",
+    "post_reactions_love_total": "reactions_love",
+    "post_reactions_wow_total": "reactions_wow",
+    "post_reactions_haha_total": "reactions_haha",
+    "post_reactions_sorry_total": "reactions_sad",
+    "post_reactions_anger_total": "reactions_angry",
+    "post_video_views": "video_views"
+}
+
+_REACTION_KEYS = (
+    "likes", "reactions_love", "reactions_wow",
+    "reactions_haha", "reactions_sad", "reactions_angry"
+)
+
+# Process-wide Graph API client, shared so connections and TLS sessions are reused across requests
+_graph_client: Optional[httpx.AsyncClient] = None
+
+
+def get_graph_client() -> httpx.AsyncClient:
+    """Return the shared Graph API client, creating it on first use with the pool limits from settings."""
+    global _graph_client
+
+    if _graph_client is None or _graph_client.is_closed:
+        _graph_client = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=settings.FACEBOOK_MAX_KEEPALIVE_CONNECTIONS,
+                max_connections=settings.FACEBOOK_MAX_CONNECTIONS,
+                keepalive_expiry=settings.FACEBOOK_KEEPALIVE_EXPIRY
+            )
+        )
+
+    return _graph_client
+
+
+async def warm_up_graph_client():
+    """Open a pooled connection to the Graph API ahead of the first real call."""
+    try:
+        await get_graph_client().head("https://graph.facebook.com/", timeout=5.0)
+    except httpx.RequestError as e:
+        logger.warning(f"Facebook connection warm-up failed: {str(e)}")
+
+
+# Process-wide Graph API rate limit: one token bucket shared by every FacebookAPIManager,
+# refilled at _GRAPH_CALLS_PER_HOUR / 3600 tokens per second by a single background task
+_GRAPH_CALLS_PER_HOUR = 200  # Facebook Graph API limit
+_rate_limit_tokens: Optional[asyncio.BoundedSemaphore] = None
+_rate_limit_refill_task: Optional[asyncio.Task] = None
+
+
+async def _acquire_rate_limit_token():
+    """Take a token from the shared rate limit bucket, waiting for a refill if it is empty."""
+    global _rate_limit_tokens, _rate_limit_refill_task
+
+    if _rate_limit_tokens is None:
+        _rate_limit_tokens = asyncio.BoundedSemaphore(_GRAPH_CALLS_PER_HOUR)
+    if _rate_limit_refill_task is None or _rate_limit_refill_task.done():
+        _rate_limit_refill_task = asyncio.create_task(_refill_rate_limit_tokens(_rate_limit_tokens))
+
+    await _rate_limit_tokens.acquire()
+
+
+async def _refill_rate_limit_tokens(tokens: asyncio.BoundedSemaphore):
+    """Return one token to the bucket every 3600 / _GRAPH_CALLS_PER_HOUR seconds."""
+    interval = 3600.0 / _GRAPH_CALLS_PER_HOUR
+    next_refill = time.monotonic() + interval
+
+    # Schedule refills against the monotonic clock so sleep overruns don't accumulate drift
+    while True:
+        await asyncio.sleep(max(0.0, next_refill - time.monotonic()))
+        next_refill += interval
+        try:
+            tokens.release()
+        except ValueError:
+            # Bucket is already full
+            pass
+
+
+async def close_graph_client():
+    """Close the shared Graph API client and stop the rate limit refill task."""
+    global _graph_client, _rate_limit_tokens, _rate_limit_refill_task
+
+    if _graph_client is not None:
+        await _graph_client.aclose()
+        _graph_client = None
+
+    if _rate_limit_refill_task is not None:
+        _rate_limit_refill_task.cancel()
+        try:
+            await _rate_limit_refill_task
+        except asyncio.CancelledError:
+            pass
+        _rate_limit_refill_task = None
+    _rate_limit_tokens = None
+
 
 class FacebookAPIManager:
     def __init__(self):
@@ -19,17 +121,7 @@ class FacebookAPIManager:
         self.app_id = settings.FACEBOOK_APP_ID
         self.app_secret = settings.FACEBOOK_APP_SECRET
 
-        self.client = httpx.AsyncClient(
-            timeout=60.0,
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        )
-
-        # Rate limiting tracking
-        self.rate_limits = {
-            "calls_per_hour": 200,  # Facebook Graph API limit
-            "calls_made": 0,
-            "reset_time": datetime.now(timezone.utc) + timedelta(hours=1)
-        }
+        self.client = get_graph_client()
 
     async def verify_page_access(self, page_id: str, access_token: str) -> Dict[str, Any]:
         """Verify page access and get page information."""
@@ -44,8 +136,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Facebook API error: {error_data.get('error', {}).get('message', 'Unknown error')}")
+                raise Exception(f"Facebook API error: {self._error_message(response)}")
 
             page_data = response.json()
 
@@ -81,7 +172,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                raise Exception(f"Token exchange failed: {response.text}")
+                raise Exception(f"Token exchange failed: {self._error_message(response)}")
 
             token_data = response.json()
 
@@ -122,26 +213,43 @@ class FacebookAPIManager:
             post_data["published"] = "false"
 
         # Handle image posts
-        if content.get("image_url"):
-            return await self._post_photo(page_id, post_data, content["image_url"])
+        if content.get("image_bytes") or content.get("image_url"):
+            return await self._post_photo(
+                page_id, post_data, content.get("image_url"), image_bytes=content.get("image_bytes")
+            )
         else:
             return await self._post_text(page_id, post_data)
 
-    async def _post_photo(self, page_id: str, post_data: Dict, image_url: str) -> Dict[str, Any]:
-        """Post photo to Facebook page."""
+    async def _post_photo(
+        self,
+        page_id: str,
+        post_data: Dict,
+        image_url: Optional[str] = None,
+        image_bytes: Optional[bytes] = None
+    ) -> Dict[str, Any]:
+        """Post photo to Facebook page.
+
+        When image_bytes is given the image is uploaded directly, so Facebook
+        does not have to fetch it back from image_url.
+        """
 
         photo_data = post_data.copy()
-        photo_data["url"] = image_url
+        files = None
+
+        if image_bytes:
+            files = {"source": ("image.jpg", image_bytes, "image/jpeg")}
+        else:
+            photo_data["url"] = image_url
 
         try:
             response = await self.client.post(
                 f"{self.base_url}/{page_id}/photos",
-                data=photo_data
+                data=photo_data,
+                files=files
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Photo post failed: {error_data.get('error', {}).get('message', response.text)}")
+                raise Exception(f"Photo post failed: {self._error_message(response)}")
 
             result = response.json()
             self._update_rate_limits()
@@ -167,8 +275,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Text post failed: {error_data.get('error', {}).get('message', response.text)}")
+                raise Exception(f"Text post failed: {self._error_message(response)}")
 
             result = response.json()
             self._update_rate_limits()
@@ -217,8 +324,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Insights fetch failed: {error_data.get('error', {}).get('message', response.text)}")
+                raise Exception(f"Insights fetch failed: {self._error_message(response)}")
 
             insights_data = response.json()
             self._update_rate_limits()
@@ -235,59 +341,22 @@ class FacebookAPIManager:
     def _process_insights_data(self, raw_insights: List[Dict]) -> Dict[str, Any]:
         """Process raw Facebook insights data into standardized format."""
 
-        processed = {
-            "impressions": 0,
-            "reach": 0,
-            "engaged_users": 0,
-            "clicks": 0,
-            "likes": 0,
-            "reactions_love": 0,
-            "reactions_wow": 0,
-            "reactions_haha": 0,
-            "reactions_sad": 0,
-            "reactions_angry": 0,
-            "video_views": 0
-        }
-
-        # Map Facebook metrics to our standardized format
-        metric_mapping = {
-            "post_impressions": "impressions",
-            "post_impressions_unique": "reach",
-            "post_engaged_users": "engaged_users", 
-            "post_clicks": "clicks",
-            "post_reactions_like_total": "likes",
-            "post_reactions_love_total": "reactions_love",
-            "post_reactions_wow_total": "reactions_wow",
-            "post_reactions_haha_total": "reactions_haha",
-            "post_reactions_sorry_total": "reactions_sad",
-            "post_reactions_anger_total": "reactions_angry",
-            "post_video_views": "video_views"
-        }
+        processed = dict.fromkeys(_POST_METRIC_MAPPING.values(), 0)
 
         for insight in raw_insights:
-            metric_name = insight.get("name")
-            if metric_name in metric_mapping:
-                values = insight.get("values", [])
-                if values:
-                    processed[metric_mapping[metric_name]] = values[0].get("value", 0)
+            out_key = _POST_METRIC_MAPPING.get(insight.get("name"))
+            values = insight.get("values")
+            if out_key and values:
+                processed[out_key] = values[0].get("value", 0)
 
         # Calculate derived metrics
-        if processed["reach"] > 0:
-            processed["engagement_rate"] = (processed["engaged_users"] / processed["reach"]) * 100
-        else:
-            processed["engagement_rate"] = 0.0
-
-        if processed["impressions"] > 0:
-            processed["click_through_rate"] = (processed["clicks"] / processed["impressions"]) * 100
-        else:
-            processed["click_through_rate"] = 0.0
+        reach = processed["reach"]
+        impressions = processed["impressions"]
+        processed["engagement_rate"] = (processed["engaged_users"] / reach) * 100 if reach > 0 else 0.0
+        processed["click_through_rate"] = (processed["clicks"] / impressions) * 100 if impressions > 0 else 0.0
 
         # Calculate total reactions
-        processed["total_reactions"] = (
-            processed["likes"] + processed["reactions_love"] + 
-            processed["reactions_wow"] + processed["reactions_haha"] + 
-            processed["reactions_sad"] + processed["reactions_angry"]
-        )
+        processed["total_reactions"] = sum(map(processed.__getitem__, _REACTION_KEYS))
 
         return processed
 
@@ -321,8 +390,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Page insights failed: {error_data.get('error', {}).get('message', response.text)}")
+                raise Exception(f"Page insights failed: {self._error_message(response)}")
 
             insights_data = response.json()
             self._update_rate_limits()
@@ -363,28 +431,25 @@ class FacebookAPIManager:
 
         return processed
 
-    async def _check_rate_limits(self):
-        """Check and enforce rate limits."""
-        current_time = datetime.now(timezone.utc)
+    def _error_message(self, response: httpx.Response) -> str:
+        """Extract the Graph API error message, decoding the body only once."""
+        raw = response.content
 
-        # Reset counters if hour has passed
-        if current_time >= self.rate_limits["reset_time"]:
-            self.rate_limits["calls_made"] = 0
-            self.rate_limits["reset_time"] = current_time + timedelta(hours=1)
+        try:
+            error_data = json.loads(raw) if raw else {}
+        except ValueError:
+            error_data = {}
+
+        message = error_data.get("error", {}).get("message") if isinstance(error_data, dict) else None
 
-        # Check if we're at the limit
-        if self.rate_limits["calls_made"] >= self.rate_limits["calls_per_hour"]:
-            wait_time = (self.rate_limits["reset_time"] - current_time).total_seconds()
-            logger.warning(f"Rate limit reached. Waiting {wait_time} seconds.")
-            await asyncio.sleep(wait_time)
+        return message or raw[:512].decode("utf-8", "replace") or "Unknown error"
 
-            # Reset after waiting
-            self.rate_limits["calls_made"] = 0
-            self.rate_limits["reset_time"] = datetime.now(timezone.utc) + timedelta(hours=1)
+    async def _check_rate_limits(self):
+        """Acquire a token from the process-wide rate limit bucket, waiting for a refill if empty."""
+        await _acquire_rate_limit_token()
 
     def _update_rate_limits(self):
-        """Update rate limit counters after successful API call."""
-        self.rate_limits["calls_made"] += 1
+        """Tokens are consumed in _check_rate_limits; nothing to record after the call."""
 
     async def delete_post(self, post_id: str, access_token: str) -> bool:
         """Delete a Facebook post."""
@@ -421,8 +486,7 @@ class FacebookAPIManager:
             )
 
             if response.status_code != 200:
-                error_data = response.json() if response.text else {}
-                raise Exception(f"Posts fetch failed: {error_data.get('error', {}).get('message', response.text)}")
+                raise Exception(f"Posts fetch failed: {self._error_message(response)}")
 
             posts_data = response.json()
             self._update_rate_limits()
@@ -434,6 +498,6 @@ class FacebookAPIManager:
             raise
 
     async def close(self):
-        """Close HTTP client."""
-        await self.client.aclose()
+        """Nothing to release per instance: the shared HTTP client and rate limit bucket are closed on
+        application shutdown."""
 
@@ -2,14 +2,16 @@ import asyncio
 import numpy as np
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict
 import json
 import logging
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from sklearn.linear_model import LinearRegression, Ridge
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error
 
+from app.core.config import settings
 from app.models.models import (
     RegionEnum, FacebookPage, PostAnalytics, 
     ContentGeneration, ScheduledPost, OptimizationInsight
@@ -18,6 +20,57 @@ from app.models.models import (
 
 logger = logging.getLogger(__name__)
 
+# Shared pool for CPU-bound analysis, so it doesn't block the event loop; NumPy releases the GIL in its kernels
+_analysis_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="content-analysis")
+
+
+def shutdown_analysis_executor():
+    """Stop the analysis pool, dropping queued work instead of waiting for it."""
+    _analysis_executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Persisted model state per (page id, region) as last read or written by this process:
+# ((inode, mtime) of the file it came from, gram, cross, solved parameters). An entry is reused only
+# while the file on disk is unchanged, so retrains saved by other workers are picked up
+_model_state_cache: Dict[
+    Tuple[int, str], Tuple[Tuple[int, int], np.ndarray, np.ndarray, Tuple[np.ndarray, ...]]
+] = {}
+
+# Regional relevance keywords
+_US_KEYWORDS = ("dollar", "$", "america", "usa", "thanksgiving", "nfl", "superbowl")
+_UK_KEYWORDS = ("pound", "£", "britain", "uk", "tea", "premier league", "bank holiday")
+
+
+def _keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile keywords into one pattern that reports every (possibly overlapping) substring match."""
+    return re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+
+
+_US_KEYWORD_RE = _keyword_pattern(_US_KEYWORDS)
+_UK_KEYWORD_RE = _keyword_pattern(_UK_KEYWORDS)
+
+# The common ISO 8601 timestamp shapes, with every time field range-checked, that datetime.fromisoformat
+# accepts: "YYYY-MM-DDTHH:MM[:SS[.fff|.ffffff]][Z|+HH:MM]". Group 1 is the date, group 2 the hour
+_ISO_TIMESTAMP_RE = re.compile(
+    r"(\d{4}-\d{2}-\d{2})[T ]([01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d{3}|\.\d{6})?)?"
+    r"(?:Z|[+-](?:[01]\d|2[0-3]):[0-5]\d)?"
+)
+
+# Columns of the model feature matrix built by ContentOptimizationEngine._features_to_array
+(
+    _HOUR_COL, _WEEKDAY_COL, _LENGTH_COL, _HASHTAG_COL,
+    _IMAGE_COL, _SENTIMENT_COL, _READABILITY_COL, _RELEVANCE_COL
+) = range(8)
+
+
+def _top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest values, largest first, without sorting the rest."""
+    if k < len(values):
+        indices = np.argpartition(-values, k - 1)[:k]
+    else:
+        indices = np.arange(len(values))
+    return indices[np.lexsort((indices, -values[indices]))]
+
 
 @dataclass
 class ContentFeatures:
@@ -45,8 +98,92 @@ class PerformanceMetrics:
     performance_score: float
 
 
+@dataclass
+class FeatureFrame:
+    """Column-oriented features and engagement for a batch of posts: the fields _analyze_all buckets."""
+    posting_hour: np.ndarray
+    posting_weekday: np.ndarray
+    caption_length: np.ndarray
+    hashtag_count: np.ndarray
+    has_image: np.ndarray
+    sentiment_score: np.ndarray
+    regional_relevance_score: np.ndarray
+    engagement_rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.engagement_rate)
+
+    @classmethod
+    def from_features(
+        cls,
+        features: List[ContentFeatures],
+        engagement_rate: np.ndarray,
+        posting_hour: np.ndarray,
+        posting_weekday: np.ndarray
+    ) -> "FeatureFrame":
+        """Build a frame from per-post content features and bulk-extracted time and engagement columns."""
+
+        n = len(features)
+
+        def column(values, dtype):
+            return np.fromiter(values, dtype=dtype, count=n)
+
+        return cls(
+            posting_hour=posting_hour,
+            posting_weekday=posting_weekday,
+            caption_length=column((f.caption_length for f in features), np.int32),
+            hashtag_count=column((min(f.hashtag_count, 127) for f in features), np.int8),  # Analysis caps at 10+
+            has_image=column((f.has_image for f in features), np.bool_),
+            sentiment_score=column((f.sentiment_score for f in features), np.float32),
+            regional_relevance_score=column((f.regional_relevance_score for f in features), np.float32),
+            engagement_rate=engagement_rate
+        )
+
+
 class ContentOptimizationEngine:
-    def __init__(self):
+    # Bucket edges for _analyze_all, in the dtype of the FeatureFrame column they bucket:
+    # caption length short < 100 <= medium < 200 <= long < 300 <= very_long < 1000,
+    # sentiment negative [-1, -0.3) / neutral [-0.3, 0.3) / positive [0.3, 1.0),
+    # regional relevance low [0, 0.3) / medium [0.3, 0.7) / high [0.7, 1.0)
+    _LENGTH_EDGES = np.array([100, 200, 300, 1000], dtype=np.int32)
+    _SENTIMENT_EDGES = np.array([-1.0, -0.3, 0.3, 1.0], dtype=np.float32)
+    _RELEVANCE_EDGES = np.array([0.0, 0.3, 0.7, 1.0], dtype=np.float32)
+    _MAX_HASHTAG_BUCKET = 10  # Cap at 10+
+
+    _LENGTH_NAMES = ("short", "medium", "long", "very_long")
+    _SENTIMENT_NAMES = ("negative", "neutral", "positive")
+    _RELEVANCE_NAMES = ("low", "medium", "high")
+    _WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+    # Variations tried by get_content_optimization_suggestions: (feature column, raw value, suggestion)
+    _TEST_DELTAS = (
+        # Different posting times
+        (_HOUR_COL, 9, "Post at 9 AM"),
+        (_HOUR_COL, 12, "Post at 12 PM"),
+        (_HOUR_COL, 18, "Post at 6 PM"),
+
+        # Different caption lengths
+        (_LENGTH_COL, 150, "Optimize caption to 150 characters"),
+        (_LENGTH_COL, 200, "Optimize caption to 200 characters"),
+
+        # With/without image
+        (_IMAGE_COL, True, "Add image to post"),
+        (_IMAGE_COL, False, "Remove image from post"),
+
+        # Different hashtag counts
+        (_HASHTAG_COL, 3, "Use 3 hashtags"),
+        (_HASHTAG_COL, 5, "Use 5 hashtags"),
+
+        # Improve sentiment
+        (_SENTIMENT_COL, 0.8, "Make content more positive"),
+        (_SENTIMENT_COL, -0.2, "Use more neutral tone")
+    )
+
+    def __init__(self, page_id: Optional[int] = None, region: Optional[RegionEnum] = None):
+        # Trained model state is persisted per page and region; engines without both keep it in memory only
+        self.page_id = page_id
+        self.region = region
+
         self.feature_weights = {
             "posting_time": 0.25,
             "content_length": 0.15,
@@ -56,11 +193,19 @@ class ContentOptimizationEngine:
             "regional_relevance": 0.15
         }
 
-        # ML Models for different metrics
-        self.engagement_model = LinearRegression()
-        self.reach_model = LinearRegression()
-        self.click_model = LinearRegression()
-        self.scaler = StandardScaler()
+        # One multi-output ridge regression predicts engagement, reach and clicks together. Training
+        # accumulates the Gram matrix of [X, 1] and its product with the targets over mini-batches;
+        # an incremental retrain adds only the new rows and re-solves without revisiting old ones
+        self.ridge_alpha = 1e-3
+        self.train_batch_size = 256
+        self._gram = np.zeros((9, 9))
+        self._cross = np.zeros((9, 3))
+
+        # float32 copies of the fitted scaler and model parameters for inline prediction
+        self._scaler_mean: Optional[np.ndarray] = None
+        self._scaler_scale: Optional[np.ndarray] = None
+        self._coef: Optional[np.ndarray] = None
+        self._intercept: Optional[np.ndarray] = None
 
         # Model performance tracking
         self.model_performance = {
@@ -69,6 +214,14 @@ class ContentOptimizationEngine:
             "click": {"accuracy": 0.0, "last_trained": None}
         }
 
+    @property
+    def last_trained_iso(self) -> Optional[str]:
+        """UTC ISO-8601 time the models were last trained, or None if they never were."""
+        last_trained = self.model_performance["engagement"]["last_trained"]
+        if last_trained is None:
+            return None
+        return datetime.fromtimestamp(last_trained, timezone.utc).isoformat()
+
     async def analyze_content_performance(
         self,
         page_id: int,
@@ -76,58 +229,82 @@ class ContentOptimizationEngine:
     ) -> Dict[str, Any]:
         """Analyze content performance patterns for a page."""
 
+        return await asyncio.get_running_loop().run_in_executor(
+            _analysis_executor, self._analyze_content_performance, posts_data
+        )
+
+    def _analyze_content_performance(self, posts_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Synchronous body of analyze_content_performance, run on the analysis pool."""
+
         if len(posts_data) < 10:
             return {"error": "Insufficient data for analysis (minimum 10 posts required)"}
 
-        # Extract features and performance metrics
+        # Extract content features, keeping only posts that parse; posting times are parsed in bulk below
         features_list = []
-        performance_list = []
+        posted_times = []
+        valid_posts = []
 
         for post_data in posts_data:
             try:
-                features = self._extract_content_features(post_data)
-                performance = self._extract_performance_metrics(post_data)
-
-                features_list.append(features)
-                performance_list.append(performance)
+                features_list.append(self._extract_content_features(post_data, parse_posting_time=False))
+                posted_times.append(self._get_posted_time(post_data))
+                valid_posts.append(post_data)
             except Exception as e:
                 logger.warning(f"Failed to process post data: {e}")
                 continue
 
+        posting_hour, posting_weekday, parsed = self._parse_posting_times(posted_times)
+        if not parsed.all():
+            logger.warning(f"Failed to parse posting time for {int((~parsed).sum())} posts")
+            features_list = [f for f, ok in zip(features_list, parsed) if ok]
+            valid_posts = [p for p, ok in zip(valid_posts, parsed) if ok]
+            posting_hour, posting_weekday = posting_hour[parsed], posting_weekday[parsed]
+
         if len(features_list) < 5:
             return {"error": "Insufficient valid data for analysis"}
 
+        # Extract engagement for all posts at once; it is the only metric the analysis aggregates
+        engagement_rate = self._extract_engagement_rates(valid_posts)
+        frame = FeatureFrame.from_features(features_list, engagement_rate, posting_hour, posting_weekday)
+
         # Analyze patterns
+        time_analysis, content_analysis, engagement_insights = self._analyze_all(frame)
         analysis_results = {
             "total_posts_analyzed": len(features_list),
-            "time_analysis": self._analyze_posting_times(features_list, performance_list),
-            "content_analysis": self._analyze_content_patterns(features_list, performance_list),
-            "engagement_insights": self._analyze_engagement_patterns(features_list, performance_list),
+            "time_analysis": time_analysis,
+            "content_analysis": content_analysis,
+            "engagement_insights": engagement_insights,
             "optimization_recommendations": []
         }
 
         # Generate recommendations
-        recommendations = self._generate_optimization_recommendations(
-            features_list, performance_list, analysis_results
-        )
+        recommendations = self._generate_optimization_recommendations(analysis_results)
         analysis_results["optimization_recommendations"] = recommendations
 
         return analysis_results
 
-    def _extract_content_features(self, post_data: Dict[str, Any]) -> ContentFeatures:
-        """Extract features from post data for analysis."""
+    def _extract_content_features(
+        self,
+        post_data: Dict[str, Any],
+        parse_posting_time: bool = True
+    ) -> ContentFeatures:
+        """Extract features from post data for analysis.
+
+        With parse_posting_time=False the posting hour/weekday are left at their
+        defaults, for callers that parse posting times in bulk.
+        """
 
-        scheduled_post = post_data.get("scheduled_post", {})
         content_gen = post_data.get("content_generation", {})
-        analytics = post_data.get("analytics", {})
 
         # Extract posting time features
-        posted_time = scheduled_post.get("actual_posted_time") or scheduled_post.get("scheduled_time")
-        if isinstance(posted_time, str):
-            posted_time = datetime.fromisoformat(posted_time.replace('Z', '+00:00'))
+        posting_hour, posting_weekday = 12, 0
+        if parse_posting_time:
+            posted_time = self._get_posted_time(post_data)
+            if isinstance(posted_time, str):
+                posted_time = datetime.fromisoformat(posted_time.replace('Z', '+00:00'))
 
-        posting_hour = posted_time.hour if posted_time else 12
-        posting_weekday = posted_time.weekday() if posted_time else 0
+            if posted_time:
+                posting_hour, posting_weekday = posted_time.hour, posted_time.weekday()
 
         # Extract content features
         caption = content_gen.get("generated_caption", "")
@@ -161,6 +338,70 @@ class ContentOptimizationEngine:
             regional_relevance_score=regional_relevance_score
         )
 
+    def _get_posted_time(self, post_data: Dict[str, Any]) -> Any:
+        """Get the actual (or else scheduled) posting time of a post, as stored."""
+
+        scheduled_post = post_data.get("scheduled_post", {})
+        return scheduled_post.get("actual_posted_time") or scheduled_post.get("scheduled_time")
+
+    def _parse_posting_times(self, posted_times: List[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Get posting hour and weekday columns for a batch of posting times.
+
+        Well-formed ISO strings are matched for the hour and their dates parsed in
+        one datetime64 conversion, rather than building a datetime per post. Missing
+        times default to hour 12 / Monday, as in _extract_content_features.
+        Returns (hour, weekday, parsed) where parsed is False for unparseable times.
+        """
+
+        n = len(posted_times)
+        hour = np.full(n, 12, dtype=np.int8)
+        weekday = np.zeros(n, dtype=np.int8)
+        parsed = np.ones(n, dtype=np.bool_)
+
+        iso_rows, iso_dates = [], []
+
+        for i, posted_time in enumerate(posted_times):
+            if not posted_time and not isinstance(posted_time, str):
+                continue
+
+            try:
+                if isinstance(posted_time, str):
+                    # Fast path: a well-formed "YYYY-MM-DDTHH:MM..." in local time of the stored offset;
+                    # any other shape is left to fromisoformat to parse or reject
+                    match = _ISO_TIMESTAMP_RE.fullmatch(posted_time)
+                    if match:
+                        hour[i] = int(match.group(2))
+                        iso_rows.append(i)
+                        iso_dates.append(match.group(1))
+                        continue
+
+                    posted_time = datetime.fromisoformat(posted_time.replace('Z', '+00:00'))
+
+                hour[i] = posted_time.hour
+                weekday[i] = posted_time.weekday()
+
+            except (ValueError, AttributeError):
+                parsed[i] = False
+
+        if iso_rows:
+            try:
+                days = np.array(iso_dates, dtype="datetime64[D]")
+            except ValueError:
+                days = np.array([self._parse_iso_date(d) for d in iso_dates], dtype="datetime64[D]")
+
+            day_numbers = days.astype(np.int64)
+            weekday[iso_rows] = (day_numbers + 3) % 7  # 1970-01-01 was a Thursday
+            parsed[iso_rows] = days >= np.datetime64("0001-01-01")  # NaT, and year 0 that datetime rejects
+
+        return hour, weekday, parsed
+
+    def _parse_iso_date(self, value: str) -> np.datetime64:
+        """Parse one YYYY-MM-DD date, returning NaT if it is invalid."""
+        try:
+            return np.datetime64(value, "D")
+        except ValueError:
+            return np.datetime64("NaT", "D")
+
     def _extract_performance_metrics(self, post_data: Dict[str, Any]) -> PerformanceMetrics:
         """Extract performance metrics from post data."""
 
@@ -200,20 +441,30 @@ class ContentOptimizationEngine:
             performance_score=performance_score
         )
 
+    def _extract_engagement_rates(self, posts_data: List[Dict[str, Any]]) -> np.ndarray:
+        """Engagement rate (engaged users per 100 reached) of each post, 0 where nothing was reached."""
+
+        analytics_list = [post_data.get("analytics", {}) for post_data in posts_data]
+
+        def column(key):
+            return np.array([a.get(key, 0) for a in analytics_list], dtype=np.float32)
+
+        reach = column("reach")
+        engaged_users = column("engaged_users")
+
+        return np.divide(engaged_users * 100, reach, out=np.zeros_like(reach), where=reach > 0)
+
     def _calculate_regional_relevance(self, caption: str, content_gen: Dict) -> float:
         """Calculate how relevant content is to the regional audience."""
 
-        # Simple keyword-based relevance scoring
-        us_keywords = ["dollar", "$", "america", "usa", "thanksgiving", "nfl", "superbowl"]
-        uk_keywords = ["pound", "£", "britain", "uk", "tea", "premier league", "bank holiday"]
-
+        # Simple keyword-based relevance scoring: number of distinct keywords present
         caption_lower = caption.lower() if caption else ""
 
-        us_score = sum(1 for keyword in us_keywords if keyword in caption_lower)
-        uk_score = sum(1 for keyword in uk_keywords if keyword in caption_lower)
+        us_score = len(set(_US_KEYWORD_RE.findall(caption_lower)))
+        uk_score = len(set(_UK_KEYWORD_RE.findall(caption_lower)))
 
         # Normalize to 0-1 scale
-        max_possible = max(len(us_keywords), len(uk_keywords))
+        max_possible = max(len(_US_KEYWORDS), len(_UK_KEYWORDS))
         relevance_score = max(us_score, uk_score) / max_possible if max_possible > 0 else 0.5
 
         return min(1.0, relevance_score)
@@ -250,178 +501,95 @@ class ContentOptimizationEngine:
 
         return min(1.0, score)
 
-    def _analyze_posting_times(
-        self,
-        features: List[ContentFeatures],
-        performance: List[PerformanceMetrics]
-    ) -> Dict[str, Any]:
-        """Analyze optimal posting times."""
-
-        hour_performance = defaultdict(list)
-        weekday_performance = defaultdict(list)
-
-        for feat, perf in zip(features, performance):
-            hour_performance[feat.posting_hour].append(perf.engagement_rate)
-            weekday_performance[feat.posting_weekday].append(perf.engagement_rate)
-
-        # Calculate average performance by hour
-        best_hours = {}
-        for hour, rates in hour_performance.items():
-            best_hours[hour] = {
-                "avg_engagement": np.mean(rates),
-                "post_count": len(rates)
-            }
-
-        # Sort by performance
-        sorted_hours = sorted(
-            best_hours.items(),
-            key=lambda x: x[1]["avg_engagement"],
-            reverse=True
+    def _analyze_all(self, frame: FeatureFrame) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+        """Analyze posting times, content patterns and engagement drivers in one sweep over the frame."""
+
+        # Bucket each column; digitize puts values below the first edge in bin 0
+        columns = (
+            (frame.posting_hour, 24),
+            (frame.posting_weekday, 7),
+            (np.digitize(frame.caption_length, self._LENGTH_EDGES), len(self._LENGTH_EDGES) + 1),
+            (np.minimum(frame.hashtag_count, self._MAX_HASHTAG_BUCKET), self._MAX_HASHTAG_BUCKET + 1),
+            (frame.has_image, 2),
+            (np.digitize(frame.sentiment_score, self._SENTIMENT_EDGES), len(self._SENTIMENT_EDGES) + 1),
+            (np.digitize(frame.regional_relevance_score, self._RELEVANCE_EDGES), len(self._RELEVANCE_EDGES) + 1)
         )
 
-        # Calculate average performance by weekday
-        best_weekdays = {}
-        weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+        # Offset every column into its own slice of one histogram, so a single bincount covers them all
+        bins = np.empty((len(columns), len(frame)), dtype=np.intp)
+        offset = 0
+        for row, (column, size) in zip(bins, columns):
+            row[:] = column
+            row += offset
+            offset += size
+
+        sums = np.bincount(bins.ravel(), weights=np.tile(frame.engagement_rate, len(columns)), minlength=offset)
+        counts = np.bincount(bins.ravel(), minlength=offset)
+        splits = np.cumsum([size for _, size in columns])[:-1]
+        hour_sums, weekday_sums, length_sums, hashtag_sums, image_sums, sentiment_sums, relevance_sums = (
+            np.split(sums, splits)
+        )
+        hour_counts, weekday_counts, length_counts, hashtag_counts, image_counts, sentiment_counts, relevance_counts = (
+            np.split(counts, splits)
+        )
 
-        for weekday, rates in weekday_performance.items():
-            best_weekdays[weekday_names[weekday]] = {
-                "avg_engagement": np.mean(rates),
-                "post_count": len(rates)
+        def bucket_stats(bucket_sums, bucket_counts, bucket):
+            return {
+                "avg_engagement": float(bucket_sums[bucket] / bucket_counts[bucket]) if bucket_counts[bucket] else 0,
+                "post_count": int(bucket_counts[bucket])
             }
 
-        return {
-            "best_hours": dict(sorted_hours[:5]),  # Top 5 hours
-            "best_weekdays": best_weekdays,
+        # Rank only the best and worst hours that have posts by average engagement
+        hours = np.flatnonzero(hour_counts)
+        hour_avg = hour_sums[hours] / hour_counts[hours]
+        best_hours = hours[_top_k_indices(hour_avg, 5)]
+        worst_hours = hours[_top_k_indices(-hour_avg, 2)[::-1]]
+
+        time_analysis = {
+            "best_hours": {
+                int(hour): bucket_stats(hour_sums, hour_counts, hour)
+                for hour in best_hours  # Top 5 hours
+            },
+            "best_weekdays": {
+                self._WEEKDAY_NAMES[weekday]: bucket_stats(weekday_sums, weekday_counts, weekday)
+                for weekday in np.flatnonzero(weekday_counts)
+            },
             "recommendations": {
-                "optimal_hours": [hour for hour, _ in sorted_hours[:3]],
-                "avoid_hours": [hour for hour, _ in sorted_hours[-2:]]
+                "optimal_hours": best_hours[:3].tolist(),
+                "avoid_hours": worst_hours.tolist()
             }
         }
 
-    def _analyze_content_patterns(
-        self,
-        features: List[ContentFeatures],
-        performance: List[PerformanceMetrics]
-    ) -> Dict[str, Any]:
-        """Analyze content patterns that drive performance."""
-
-        # Analyze caption length impact
-        length_buckets = {
-            "short": (0, 100),
-            "medium": (100, 200),
-            "long": (200, 300),
-            "very_long": (300, 1000)
-        }
-
-        length_performance = defaultdict(list)
-
-        for feat, perf in zip(features, performance):
-            for bucket, (min_len, max_len) in length_buckets.items():
-                if min_len <= feat.caption_length < max_len:
-                    length_performance[bucket].append(perf.engagement_rate)
-                    break
-
-        # Analyze hashtag impact
-        hashtag_performance = defaultdict(list)
-        for feat, perf in zip(features, performance):
-            hashtag_bucket = min(feat.hashtag_count, 10)  # Cap at 10+
-            hashtag_performance[hashtag_bucket].append(perf.engagement_rate)
-
-        # Analyze image impact
-        image_performance = {"with_image": [], "without_image": []}
-        for feat, perf in zip(features, performance):
-            if feat.has_image:
-                image_performance["with_image"].append(perf.engagement_rate)
-            else:
-                image_performance["without_image"].append(perf.engagement_rate)
-
-        return {
+        content_analysis = {
             "caption_length_analysis": {
-                bucket: {
-                    "avg_engagement": np.mean(rates) if rates else 0,
-                    "post_count": len(rates)
-                }
-                for bucket, rates in length_performance.items()
+                self._LENGTH_NAMES[bucket]: bucket_stats(length_sums, length_counts, bucket)
+                for bucket in np.flatnonzero(length_counts[:4])
             },
             "hashtag_analysis": {
-                count: {
-                    "avg_engagement": np.mean(rates) if rates else 0,
-                    "post_count": len(rates)
-                }
-                for count, rates in hashtag_performance.items()
+                int(count): bucket_stats(hashtag_sums, hashtag_counts, count)
+                for count in np.flatnonzero(hashtag_counts)
             },
             "image_impact": {
-                "with_image": {
-                    "avg_engagement": np.mean(image_performance["with_image"]) if image_performance["with_image"] else 0,
-                    "post_count": len(image_performance["with_image"])
-                },
-                "without_image": {
-                    "avg_engagement": np.mean(image_performance["without_image"]) if image_performance["without_image"] else 0,
-                    "post_count": len(image_performance["without_image"])
-                }
+                "with_image": bucket_stats(image_sums, image_counts, 1),
+                "without_image": bucket_stats(image_sums, image_counts, 0)
             }
         }
 
-    def _analyze_engagement_patterns(
-        self,
-        features: List[ContentFeatures],
-        performance: List[PerformanceMetrics]
-    ) -> Dict[str, Any]:
-        """Analyze what drives engagement."""
-
-        # Sentiment impact analysis
-        sentiment_buckets = {
-            "negative": (-1.0, -0.3),
-            "neutral": (-0.3, 0.3),
-            "positive": (0.3, 1.0)
-        }
-
-        sentiment_performance = defaultdict(list)
-
-        for feat, perf in zip(features, performance):
-            for bucket, (min_sent, max_sent) in sentiment_buckets.items():
-                if min_sent <= feat.sentiment_score < max_sent:
-                    sentiment_performance[bucket].append(perf.engagement_rate)
-                    break
-
-        # Regional relevance impact
-        relevance_buckets = {
-            "low": (0.0, 0.3),
-            "medium": (0.3, 0.7),
-            "high": (0.7, 1.0)
-        }
-
-        relevance_performance = defaultdict(list)
-
-        for feat, perf in zip(features, performance):
-            for bucket, (min_rel, max_rel) in relevance_buckets.items():
-                if min_rel <= feat.regional_relevance_score < max_rel:
-                    relevance_performance[bucket].append(perf.engagement_rate)
-                    break
-
-        return {
+        # Sentiment and relevance bin 0 is below the first edge and bin 4 at or above the last; neither is reported
+        engagement_insights = {
             "sentiment_impact": {
-                bucket: {
-                    "avg_engagement": np.mean(rates) if rates else 0,
-                    "post_count": len(rates)
-                }
-                for bucket, rates in sentiment_performance.items()
+                self._SENTIMENT_NAMES[bucket - 1]: bucket_stats(sentiment_sums, sentiment_counts, bucket)
+                for bucket in np.flatnonzero(sentiment_counts[:4]) if bucket > 0
             },
             "regional_relevance_impact": {
-                bucket: {
-                    "avg_engagement": np.mean(rates) if rates else 0,
-                    "post_count": len(rates)
-                }
-                for bucket, rates in relevance_performance.items()
+                self._RELEVANCE_NAMES[bucket - 1]: bucket_stats(relevance_sums, relevance_counts, bucket)
+                for bucket in np.flatnonzero(relevance_counts[:4]) if bucket > 0
             }
         }
 
-    def _generate_optimization_recommendations(
-        self,
-        features: List[ContentFeatures],
-        performance: List[PerformanceMetrics],
-        analysis: Dict[str, Any]
-    ) -> List[Dict[str, Any]]:
+        return time_analysis, content_analysis, engagement_insights
+
+    def _generate_optimization_recommendations(self, analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate actionable optimization recommendations."""
 
         recommendations = []
@@ -462,7 +630,8 @@ class ContentOptimizationEngine:
             with_image_eng = image_impact.get("with_image", {}).get("avg_engagement", 0)
             without_image_eng = image_impact.get("without_image", {}).get("avg_engagement", 0)
 
-            if with_image_eng > without_image_eng * 1.2:  # 20% better
+            # No percentage to report when there is no without-image baseline (e.g. every post has an image)
+            if without_image_eng > 0 and with_image_eng > without_image_eng * 1.2:  # 20% better
                 recommendations.append({
                     "type": "visual_content",
                     "priority": "high",
@@ -510,9 +679,16 @@ class ContentOptimizationEngine:
     async def train_predictive_models(
         self,
         features_data: List[ContentFeatures],
-        performance_data: List[PerformanceMetrics]
+        performance_data: List[PerformanceMetrics],
+        incremental: bool = False
     ) -> Dict[str, float]:
-        """Train ML models to predict content performance."""
+        """Train ML models to predict content performance.
+
+        By default the models are fit from scratch on the given posts, which should be the page's full
+        history. With incremental=True the training rows are added to the page's latest persisted state
+        (or, for engines that aren't persisted, to those of earlier calls), so pass only posts that
+        haven't been trained on before.
+        """
 
         if len(features_data) < 20:
             logger.warning("Insufficient data for model training")
@@ -526,41 +702,44 @@ class ContentOptimizationEngine:
         y_reach = [p.reach_rate for p in performance_data]
         y_clicks = [p.click_through_rate for p in performance_data]
 
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X)
+        y = np.column_stack([y_engagement, y_reach, y_clicks])
 
         # Split data for training and validation
-        split_idx = int(len(X_scaled) * 0.8)
-        X_train, X_val = X_scaled[:split_idx], X_scaled[split_idx:]
-
-        y_engagement_train, y_engagement_val = y_engagement[:split_idx], y_engagement[split_idx:]
-        y_reach_train, y_reach_val = y_reach[:split_idx], y_reach[split_idx:]
-        y_clicks_train, y_clicks_val = y_clicks[:split_idx], y_clicks[split_idx:]
+        split_idx = int(len(X) * 0.8)
+        X_train, X_val = X[:split_idx], X[split_idx:]
+        y_train, y_val = y[:split_idx], y[split_idx:]
 
         # Train models
         models_performance = {}
 
         try:
-            # Engagement model
-            self.engagement_model.fit(X_train, y_engagement_train)
-            engagement_pred = self.engagement_model.predict(X_val)
-            engagement_mse = mean_squared_error(y_engagement_val, engagement_pred)
-            models_performance["engagement_mse"] = engagement_mse
+            # Fold the training rows into the running sums mini-batch by mini-batch, then solve once
+            if incremental:
+                await self.load_model_state()
+                gram, cross = self._gram.copy(), self._cross.copy()
+            else:
+                gram, cross = np.zeros_like(self._gram), np.zeros_like(self._cross)
+            for start in range(0, split_idx, self.train_batch_size):
+                X_batch = np.empty((min(self.train_batch_size, split_idx - start), 9))
+                X_batch[:, :8] = X_train[start:start + self.train_batch_size]
+                X_batch[:, 8] = 1.0
+                gram += X_batch.T @ X_batch
+                cross += X_batch.T @ y_train[start:start + self.train_batch_size]
+
+            mean, scale, coef, intercept = self._solve_ridge(gram, cross)
+            val_pred = ((X_val - mean) / scale) @ coef.T + intercept
+            engagement_mse, reach_mse, clicks_mse = ((val_pred - y_val) ** 2).mean(axis=0).tolist()
 
-            # Reach model
-            self.reach_model.fit(X_train, y_reach_train)
-            reach_pred = self.reach_model.predict(X_val)
-            reach_mse = mean_squared_error(y_reach_val, reach_pred)
+            models_performance["engagement_mse"] = engagement_mse
             models_performance["reach_mse"] = reach_mse
-
-            # Click model
-            self.click_model.fit(X_train, y_clicks_train)
-            clicks_pred = self.click_model.predict(X_val)
-            clicks_mse = mean_squared_error(y_clicks_val, clicks_pred)
             models_performance["clicks_mse"] = clicks_mse
 
+            self._gram, self._cross = gram, cross
+            self._stash_parameters(mean, scale, coef, intercept)
+            await asyncio.get_running_loop().run_in_executor(_analysis_executor, self._save_model_state)
+
             # Update model performance tracking
-            now = datetime.now(timezone.utc)
+            now = time.time()  # Unix timestamp; see last_trained_iso
             self.model_performance["engagement"]["accuracy"] = 1.0 / (1.0 + engagement_mse)
             self.model_performance["engagement"]["last_trained"] = now
 
@@ -578,55 +757,210 @@ class ContentOptimizationEngine:
 
         return models_performance
 
+    def _solve_ridge(
+        self,
+        gram: np.ndarray,
+        cross: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Solve the standardized multi-output ridge regression from the running sums.
+
+        Equivalent to StandardScaler followed by Ridge(alpha=ridge_alpha) on every row seen so far.
+        Returns (scaler mean, scaler scale, coef of shape (3, 8), intercept of shape (3,)).
+        """
+        n = gram[8, 8]
+        mean = gram[:8, 8] / n
+        y_mean = cross[8] / n
+
+        # Centered second moments; constant columns keep a unit scale and get a zero coefficient
+        cov = gram[:8, :8] - n * np.outer(mean, mean)
+        cross_cov = cross[:8] - n * np.outer(mean, y_mean)
+        var = np.diag(cov) / n
+        constant = var <= 1e-10 * np.maximum(1.0, mean ** 2)
+        scale = np.where(constant, 1.0, np.sqrt(np.maximum(var, 0.0)))
+        cov[constant, :] = 0.0
+        cov[:, constant] = 0.0
+        cross_cov[constant] = 0.0
+
+        lhs = cov / np.outer(scale, scale) + self.ridge_alpha * np.eye(8)
+        coef = np.linalg.solve(lhs, cross_cov / scale[:, None]).T
+
+        return mean, scale, coef, y_mean
+
+    def _stash_parameters(self, mean: np.ndarray, scale: np.ndarray, coef: np.ndarray, intercept: np.ndarray):
+        """Stash float32 parameters so prediction is a single matmul."""
+        self._scaler_mean = mean.astype(np.float32)
+        self._scaler_scale = scale.astype(np.float32)
+        self._coef = coef.astype(np.float32)
+        self._intercept = intercept.astype(np.float32)
+
+    def _model_state_key(self) -> Optional[Tuple[int, str]]:
+        """Key of this engine's persisted model state, or None if it isn't persisted."""
+        if not settings.MODEL_STATE_DIR or self.page_id is None or self.region is None:
+            return None
+        return self.page_id, RegionEnum(self.region).value
+
+    def _model_state_path(self, key: Tuple[int, str]) -> str:
+        page_id, region = key
+        return os.path.join(settings.MODEL_STATE_DIR, f"page_{page_id}_{region.lower()}.npz")
+
+    def _save_model_state(self):
+        """Persist the running sums so restarts skip cold training and keep accumulating."""
+        key = self._model_state_key()
+        if key is None:
+            return
+
+        path = self._model_state_path(key)
+        try:
+            os.makedirs(settings.MODEL_STATE_DIR, exist_ok=True)
+
+            # Unique temporary file in the same directory, so concurrent writers never share one
+            # and the final rename is atomic
+            fd, tmp_path = tempfile.mkstemp(dir=settings.MODEL_STATE_DIR, suffix=".npz.tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    np.savez(f, gram=self._gram, cross=self._cross)
+                    f.flush()
+                    stat = os.fstat(f.fileno())  # The rename keeps the inode and mtime
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"Failed to save model state to {path}: {e}")
+            return
+
+        _model_state_cache[key] = (
+            (stat.st_ino, stat.st_mtime_ns), self._gram.copy(), self._cross.copy(),
+            (self._scaler_mean, self._scaler_scale, self._coef, self._intercept)
+        )
+
+    async def load_model_state(self):
+        """Restore this page's latest persisted models, if any, so predictions work before a retrain.
+
+        The file is checked off the event loop; it is only re-read when it changed since this process
+        last read or wrote it.
+        """
+        key = self._model_state_key()
+        if key is None:
+            return
+
+        state = await asyncio.get_running_loop().run_in_executor(
+            _analysis_executor, self._read_model_state, key
+        )
+        if state is not None:
+            gram, cross, parameters = state
+            self._gram, self._cross = gram.copy(), cross.copy()
+            self._stash_parameters(*parameters)
+
+    def _read_model_state(
+        self,
+        key: Tuple[int, str]
+    ) -> Optional[Tuple[np.ndarray, np.ndarray, Tuple[np.ndarray, ...]]]:
+        """Current (gram, cross, solved parameters) of one page's persisted state, or None if there is none.
+
+        Served from the process-wide cache while the file is unchanged; missing files are never cached.
+        """
+        path = self._model_state_path(key)
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            _model_state_cache.pop(key, None)
+            return None
+        except OSError as e:
+            logger.warning(f"Failed to load model state from {path}: {e}")
+            return None
+
+        version = (stat.st_ino, stat.st_mtime_ns)
+        cached = _model_state_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1:]
+
+        try:
+            with np.load(path) as saved:
+                gram, cross = saved["gram"], saved["cross"]
+            if gram.shape != self._gram.shape or cross.shape != self._cross.shape:
+                raise ValueError("unexpected parameter shapes")
+            parameters = self._solve_ridge(gram, cross)
+        except (OSError, KeyError, ValueError, np.linalg.LinAlgError) as e:
+            logger.warning(f"Failed to load model state from {path}: {e}")
+            return None
+
+        _model_state_cache[key] = (version, gram, cross, parameters)
+        return gram, cross, parameters
+
     def _features_to_array(self, features: List[ContentFeatures]) -> np.ndarray:
         """Convert ContentFeatures list to numpy array for ML models."""
 
-        feature_arrays = []
+        return self._normalize_features(self._features_to_raw_array(features))
+
+    def _features_to_raw_array(self, features: List[ContentFeatures]) -> np.ndarray:
+        """Fill one float32 column per feature attribute, before normalization."""
+
+        n = len(features)
+        out = np.empty((n, 8), dtype=np.float32)
+
+        out[:, _HOUR_COL] = np.fromiter((f.posting_hour for f in features), dtype=np.float32, count=n)
+        out[:, _WEEKDAY_COL] = np.fromiter((f.posting_weekday for f in features), dtype=np.float32, count=n)
+        out[:, _LENGTH_COL] = np.fromiter((f.caption_length for f in features), dtype=np.float32, count=n)
+        out[:, _HASHTAG_COL] = np.fromiter((f.hashtag_count for f in features), dtype=np.float32, count=n)
+        out[:, _IMAGE_COL] = np.fromiter((f.has_image for f in features), dtype=np.float32, count=n)
+        out[:, _SENTIMENT_COL] = np.fromiter((f.sentiment_score for f in features), dtype=np.float32, count=n)
+        out[:, _READABILITY_COL] = np.fromiter((f.readability_score for f in features), dtype=np.float32, count=n)
+        out[:, _RELEVANCE_COL] = np.fromiter(
+            (f.regional_relevance_score for f in features), dtype=np.float32, count=n
+        )
+
+        return out
+
+    def _normalize_features(self, out: np.ndarray) -> np.ndarray:
+        """Normalize a raw feature matrix in place, whole columns at once."""
+
+        out[:, _HOUR_COL] *= 1 / 24.0  # Normalize to 0-1
+        out[:, _WEEKDAY_COL] *= 1 / 6.0  # Normalize to 0-1
+        out[:, _LENGTH_COL] *= 1 / 300.0  # Normalize, cap at 300
+        out[:, _HASHTAG_COL] *= 1 / 10.0  # Normalize, cap at 10
+        np.minimum(out[:, _LENGTH_COL:_HASHTAG_COL + 1], 1.0, out=out[:, _LENGTH_COL:_HASHTAG_COL + 1])
+        out[:, _SENTIMENT_COL] += 1.0  # Convert -1,1 to 0,1
+        out[:, _SENTIMENT_COL] *= 0.5
+        out[:, _READABILITY_COL] *= 1 / 100.0  # Normalize to 0-1
+        # Regional relevance is already 0-1
+
+        return out
 
-        for feat in features:
-            feature_vector = [
-                feat.posting_hour / 24.0,  # Normalize to 0-1
-                feat.posting_weekday / 6.0,  # Normalize to 0-1
-                min(feat.caption_length / 300.0, 1.0),  # Normalize, cap at 300
-                min(feat.hashtag_count / 10.0, 1.0),  # Normalize, cap at 10
-                float(feat.has_image),  # Binary feature
-                (feat.sentiment_score + 1.0) / 2.0,  # Convert -1,1 to 0,1
-                feat.readability_score / 100.0,  # Normalize to 0-1
-                feat.regional_relevance_score  # Already 0-1
-            ]
-            feature_arrays.append(feature_vector)
+    def _predict_batch(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """Predict every fitted model for each row of an unscaled feature matrix."""
 
-        return np.array(feature_arrays)
+        if self._coef is None:
+            raise ValueError("Models have not been trained yet")
+
+        # Inline standardization + ridge regression for the parameters fitted in train_predictive_models
+        X_scaled = (X - self._scaler_mean) / self._scaler_scale
+        preds = np.maximum(0, X_scaled @ self._coef.T + self._intercept)
+        predictions = {
+            "engagement_rate": preds[:, 0],
+            "reach_rate": preds[:, 1],
+            "click_through_rate": preds[:, 2]
+        }
+
+        # Calculate overall predicted performance score
+        avg_performance = sum(predictions.values()) / len(predictions)
+        predictions["overall_score"] = np.minimum(1.0, avg_performance / 10.0)  # Normalize
+
+        return predictions
 
     def predict_content_performance(self, features: ContentFeatures) -> Dict[str, float]:
         """Predict performance for given content features."""
 
         # Convert features to array format
         X = self._features_to_array([features])
-        X_scaled = self.scaler.transform(X)
-
-        predictions = {}
 
         try:
-            if hasattr(self.engagement_model, 'coef_'):
-                predictions["engagement_rate"] = max(0, self.engagement_model.predict(X_scaled)[0])
-
-            if hasattr(self.reach_model, 'coef_'):
-                predictions["reach_rate"] = max(0, self.reach_model.predict(X_scaled)[0])
-
-            if hasattr(self.click_model, 'coef_'):
-                predictions["click_through_rate"] = max(0, self.click_model.predict(X_scaled)[0])
-
-            # Calculate overall predicted performance score
-            if predictions:
-                avg_performance = sum(predictions.values()) / len(predictions)
-                predictions["overall_score"] = min(1.0, avg_performance / 10.0)  # Normalize
+            return {metric: float(values[0]) for metric, values in self._predict_batch(X).items()}
 
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
-            predictions["error"] = str(e)
-
-        return predictions
+            return {"error": str(e)}
 
     def get_content_optimization_suggestions(
         self,
@@ -637,38 +971,24 @@ class ContentOptimizationEngine:
 
         suggestions = []
 
-        # Get current predicted performance
-        current_prediction = self.predict_content_performance(features)
-        current_score = current_prediction.get("overall_score", 0.5)
-
-        # Test different variations
-        test_features = [
-            # Different posting times
-            (features._replace(posting_hour=9), "Post at 9 AM"),
-            (features._replace(posting_hour=12), "Post at 12 PM"),
-            (features._replace(posting_hour=18), "Post at 6 PM"),
-
-            # Different caption lengths
-            (features._replace(caption_length=150), "Optimize caption to 150 characters"),
-            (features._replace(caption_length=200), "Optimize caption to 200 characters"),
-
-            # With/without image
-            (features._replace(has_image=True), "Add image to post"),
-            (features._replace(has_image=False), "Remove image from post"),
+        # Row 0 is the current content; each later row overrides one raw feature, then all are normalized at once
+        X = np.tile(self._features_to_raw_array([features]), (len(self._TEST_DELTAS) + 1, 1))
+        for row, (column, value, _) in enumerate(self._TEST_DELTAS, start=1):
+            X[row, column] = value
+        self._normalize_features(X)
 
-            # Different hashtag counts
-            (features._replace(hashtag_count=3), "Use 3 hashtags"),
-            (features._replace(hashtag_count=5), "Use 5 hashtags"),
+        try:
+            scores = self._predict_batch(X).get("overall_score")
+        except Exception as e:
+            logger.error(f"Prediction failed: {e}")
+            scores = None
 
-            # Improve sentiment
-            (features._replace(sentiment_score=0.8), "Make content more positive"),
-            (features._replace(sentiment_score=-0.2), "Use more neutral tone")
-        ]
+        if scores is None:
+            scores = np.full(len(X), 0.5)
 
-        for test_feature, description in test_features:
-            predicted_performance = self.predict_content_performance(test_feature)
-            predicted_score = predicted_performance.get("overall_score", 0.5)
+        current_score = float(scores[0])
 
+        for (_, _, description), predicted_score in zip(self._TEST_DELTAS, scores[1:].tolist()):
             improvement = (predicted_score - current_score) / current_score if current_score > 0 else 0
 
             if improvement >= target_improvement:
@@ -683,4 +1003,3 @@ class ContentOptimizationEngine:
         suggestions.sort(key=lambda x: float(x["expected_improvement"].rstrip('%')), reverse=True)
 
         return suggestions[:5]  # Return top 5 suggestions
-
@@ -1,8 +1,12 @@
 import asyncio
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import groupby
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
+import numpy as np
 import pytz
-import random
 import logging
 
 from app.core.config import settings
@@ -13,15 +17,83 @@ from app.core.security import SecurityManager
 
 logger = logging.getLogger(__name__)
 
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_MICROSECOND = timedelta(microseconds=1)
+_SECOND_US = 1_000_000
+_MINUTE_US = 60 * _SECOND_US
+_HOUR_US = 60 * _MINUTE_US
+_DAY_US = 24 * _HOUR_US
+
+
+def _to_us(value: datetime) -> int:
+    """Microseconds since the UTC epoch for an aware datetime."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+@dataclass(slots=True)
+class Schedule:
+    """Posting times as int64 microseconds since the UTC epoch, one entry per post."""
+    utc_us: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.utc_us)
+
+    @classmethod
+    def from_datetimes(cls, times: List[datetime]) -> "Schedule":
+        return cls(np.fromiter((_to_us(t) for t in times), dtype=np.int64, count=len(times)))
+
+    def to_datetimes(self) -> List[datetime]:
+        return [_EPOCH + timedelta(microseconds=us) for us in self.utc_us.tolist()]
+
+
+@lru_cache(maxsize=None)
+def _get_tz(name: str) -> pytz.BaseTzInfo:
+    """Return the pytz timezone for name, constructed once per process."""
+    return pytz.timezone(name)
+
+
+@lru_cache(maxsize=None)
+def _tz_transitions(regional_tz: pytz.BaseTzInfo) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """UTC transition instants (epoch microseconds) of a pytz zone and the UTC offset (microseconds)
+    in effect from each one, read from the zone's own transition table.
+
+    The table is a pytz internal; returns None if the zone doesn't expose one in the expected form.
+    """
+    naive_epoch = _EPOCH.replace(tzinfo=None)
+
+    if regional_tz is pytz.utc or isinstance(regional_tz, pytz.tzinfo.StaticTzInfo):
+        # Fixed-offset zones have no transitions
+        offset = regional_tz.utcoffset(naive_epoch)
+        return np.zeros(1, dtype=np.int64), np.array([offset // _MICROSECOND], dtype=np.int64)
+
+    try:
+        transitions = np.array(
+            [(t - naive_epoch) // _MICROSECOND for t in regional_tz._utc_transition_times], dtype=np.int64
+        )
+        offsets = np.array([info[0] // _MICROSECOND for info in regional_tz._transition_info], dtype=np.int64)
+    except (AttributeError, TypeError, IndexError, ValueError):
+        return None
+
+    if len(transitions) == 0 or len(transitions) != len(offsets):
+        return None
+    return transitions, offsets
+
 
 class ContentScheduler:
     def __init__(self):
         self.fb_api = FacebookAPIManager()
 
+        # UTC singleton, kept on the instance so hot paths skip the module attribute lookup
+        self._utc = timezone.utc
+
+        # Random source for posting-time variation; each call draws all its values in one batch
+        self._rng = np.random.default_rng()
+
         # Regional timezone mapping
         self.regional_timezones = {
-            RegionEnum.US: pytz.timezone(settings.TIMEZONE_US),
-            RegionEnum.UK: pytz.timezone(settings.TIMEZONE_UK)
+            RegionEnum.US: _get_tz(settings.TIMEZONE_US),
+            RegionEnum.UK: _get_tz(settings.TIMEZONE_UK)
         }
 
         # Optimal posting times by region (24-hour format)
@@ -36,6 +108,20 @@ class ContentScheduler:
             }
         }
 
+        # Same hours as a (weekday, hour) lookup table, Monday = 0
+        self._optimal_hour_table = {}
+        for region, times in self.optimal_posting_times.items():
+            table = np.zeros((7, 24), dtype=np.bool_)
+            table[:5, times["weekday"]] = True
+            table[5:, times["weekend"]] = True
+            self._optimal_hour_table[region] = table
+
+        # Hours to post at for each region and local weekday (Monday = 0), resolved once here
+        self._hours_by_dow = {
+            region: [tuple(times["weekday"])] * 5 + [tuple(times["weekend"])] * 2
+            for region, times in self.optimal_posting_times.items()
+        }
+
         # Content frequency limits to avoid spamming
         self.posting_limits = {
             "min_interval_hours": 2,    # Minimum time between posts
@@ -43,6 +129,12 @@ class ContentScheduler:
             "max_weekly_posts": 30      # Maximum posts per week
         }
 
+        # The same limits in the form the checks use
+        self._min_interval_us = self.posting_limits["min_interval_hours"] * _HOUR_US
+        self._max_daily = self.posting_limits["max_daily_posts"]
+        self._max_weekly = self.posting_limits["max_weekly_posts"]
+        self._week_us = 7 * _DAY_US
+
     def get_optimal_posting_times(
         self, 
         region: RegionEnum, 
@@ -51,86 +143,124 @@ class ContentScheduler:
     ) -> List[datetime]:
         """Get optimal posting times for a specific date and region."""
 
-        timezone = self.regional_timezones[region]
-        local_date = target_date.astimezone(timezone)
-
-        # Determine if it's weekday or weekend
-        is_weekend = local_date.weekday() >= 5  # Saturday = 5, Sunday = 6
-        time_key = "weekend" if is_weekend else "weekday"
+        regional_tz = self.regional_timezones[region]
+        local_date = target_date.astimezone(regional_tz)
 
         # Use page preferences if available, otherwise use regional defaults
-        optimal_hours = page_preferences or self.optimal_posting_times[region][time_key]
+        optimal_hours = page_preferences or self._hours_by_dow[region][local_date.weekday()]
+
+        # Random minute for natural variation
+        minutes = self._rng.integers(0, 60, size=len(optimal_hours)).tolist()
 
         # Create datetime objects for each optimal hour
         optimal_times = []
-        for hour in optimal_hours:
+        for hour, minute in zip(optimal_hours, minutes):
             optimal_time = local_date.replace(
                 hour=hour, 
-                minute=random.randint(0, 59),  # Random minute for natural variation
+                minute=minute,
                 second=0, 
                 microsecond=0
             )
 
             # Convert back to UTC
-            utc_time = optimal_time.astimezone(timezone.utc)
+            utc_time = optimal_time.astimezone(self._utc)
             optimal_times.append(utc_time)
 
-        return sorted(optimal_times)
+        optimal_times.sort()  # Already in order unless page preferences are unordered
+        return optimal_times
+
+    def _iter_optimal_times(
+        self,
+        region: RegionEnum,
+        target_date: datetime,
+        page_preferences: Optional[List[int]] = None
+    ) -> Iterator[datetime]:
+        """Yield the same optimal posting times as get_optimal_posting_times, in order, drawing each
+        random minute only when the caller asks for the next time."""
+
+        regional_tz = self.regional_timezones[region]
+        local_date = target_date.astimezone(regional_tz)
+
+        optimal_hours = page_preferences or self._hours_by_dow[region][local_date.weekday()]
+
+        # Times keep the local date's UTC offset, so hour order is time order; only repeated
+        # hours need their minutes drawn together and sorted
+        for hour, repeats in groupby(sorted(optimal_hours)):
+            minutes = sorted(self._rng.integers(0, 60, size=len(list(repeats))).tolist())
+            for minute in minutes:
+                yield local_date.replace(
+                    hour=hour,
+                    minute=minute,
+                    second=0,
+                    microsecond=0
+                ).astimezone(self._utc)
 
     def calculate_next_posting_slot(
         self,
         region: RegionEnum,
         existing_posts: List[datetime],
         preferred_frequency_hours: int = 6,
-        page_preferences: Optional[List[int]] = None
+        page_preferences: Optional[List[int]] = None,
+        now_utc: Optional[datetime] = None
     ) -> datetime:
         """Calculate the next available posting slot."""
 
-        now_utc = datetime.now(timezone.utc)
+        now_utc = now_utc or datetime.now(self._utc)
         regional_tz = self.regional_timezones[region]
 
+        # Sort the existing posts once as integer microseconds, so each candidate slot only needs
+        # integer comparisons against its two neighbours
+        existing = Schedule.from_datetimes(existing_posts).utc_us
+        order = np.argsort(existing, kind="stable")
+        sorted_existing = existing[order].tolist()
+        now_us = _to_us(now_utc)
+
         # Look ahead for the next 7 days
         for days_ahead in range(7):
             target_date = now_utc + timedelta(days=days_ahead)
 
-            # Get optimal times for this date
-            optimal_times = self.get_optimal_posting_times(
+            # Walk this date's optimal times lazily, stopping at the first free one
+            optimal_times = self._iter_optimal_times(
                 region=region,
                 target_date=target_date,
                 page_preferences=page_preferences
             )
 
             for optimal_time in optimal_times:
+                optimal_us = _to_us(optimal_time)
+
                 # Skip past times
-                if optimal_time <= now_utc:
+                if optimal_us <= now_us:
                     continue
 
                 # Check if this slot conflicts with existing posts
-                if self._is_slot_available(optimal_time, existing_posts):
+                if self._is_slot_available_sorted(optimal_us, sorted_existing, self._min_interval_us):
                     return optimal_time
 
         # Fallback: schedule for next available slot based on frequency
-        if existing_posts:
-            last_post_time = max(existing_posts)
+        if sorted_existing:
+            last_post_time = existing_posts[order[-1]]
             next_slot = last_post_time + timedelta(hours=preferred_frequency_hours)
         else:
             next_slot = now_utc + timedelta(hours=1)  # Start in 1 hour
 
         return self._adjust_to_optimal_time(next_slot, region, page_preferences)
 
-    def _is_slot_available(
-        self, 
-        proposed_time: datetime, 
-        existing_posts: List[datetime],
-        min_gap_hours: int = 2
+    def _is_slot_available_sorted(
+        self,
+        proposed_us: int,
+        sorted_existing: List[int],
+        min_gap_us: int
     ) -> bool:
-        """Check if a proposed posting time conflicts with existing posts."""
+        """Check a proposed posting time against sorted existing posts (all UTC epoch microseconds),
+        looking only at its neighbours."""
 
-        min_gap = timedelta(hours=min_gap_hours)
+        idx = bisect_left(sorted_existing, proposed_us)
 
-        for existing_time in existing_posts:
-            if abs(proposed_time - existing_time) < min_gap:
-                return False
+        if idx > 0 and proposed_us - sorted_existing[idx - 1] < min_gap_us:
+            return False
+        if idx < len(sorted_existing) and sorted_existing[idx] - proposed_us < min_gap_us:
+            return False
 
         return True
 
@@ -142,9 +272,6 @@ class ContentScheduler:
     ) -> datetime:
         """Adjust a base time to the nearest optimal posting time."""
 
-        regional_tz = self.regional_timezones[region]
-        local_time = base_time.astimezone(regional_tz)
-
         # Get optimal times for this day
         optimal_times = self.get_optimal_posting_times(
             region=region,
@@ -155,10 +282,19 @@ class ContentScheduler:
         if not optimal_times:
             return base_time
 
-        # Find the closest optimal time
-        closest_time = min(optimal_times, key=lambda t: abs((t - base_time).total_seconds()))
+        # Find the closest optimal time on integer keys: the sorted neighbours on either side,
+        # preferring the earlier on a tie
+        optimal_us = [_to_us(t) for t in optimal_times]
+        base_us = _to_us(base_time)
+        idx = bisect_left(optimal_us, base_us)
+        if idx == 0:
+            return optimal_times[0]
+        if idx == len(optimal_times):
+            return optimal_times[-1]
 
-        return closest_time
+        if base_us - optimal_us[idx - 1] <= optimal_us[idx] - base_us:
+            return optimal_times[idx - 1]
+        return optimal_times[idx]
 
     def generate_posting_schedule(
         self,
@@ -170,70 +306,105 @@ class ContentScheduler:
     ) -> List[datetime]:
         """Generate a complete posting schedule for a date range."""
 
-        schedule = []
-        current_date = start_date
-
         # Extract page preferences
         optimal_hours = page_preferences.get("optimal_posting_times") if page_preferences else None
         min_interval = page_preferences.get("min_interval_hours", 2) if page_preferences else 2
 
-        while current_date <= end_date:
-            # Get optimal times for this day
-            daily_optimal_times = self.get_optimal_posting_times(
-                region=region,
-                target_date=current_date,
-                page_preferences=optimal_hours
-            )
-
-            # Select subset based on posts_per_day
-            if len(daily_optimal_times) > posts_per_day:
-                # Randomly sample to avoid predictable patterns
-                selected_times = random.sample(daily_optimal_times, posts_per_day)
-                selected_times.sort()
-            else:
-                selected_times = daily_optimal_times
-
-            # Ensure minimum interval between posts
-            filtered_times = []
-            last_time = None
-
-            for time_slot in selected_times:
-                if last_time is None or (time_slot - last_time).total_seconds() >= min_interval * 3600:
-                    filtered_times.append(time_slot)
-                    last_time = time_slot
-
-            schedule.extend(filtered_times)
-            current_date += timedelta(days=1)
+        n_days = max(0, (end_date - start_date).days + 1)
+        regional_tz = self.regional_timezones[region]
 
-        return sorted(schedule)
+        # Local midnight of each day as UTC epoch seconds (at that day's offset), and its local weekday
+        day_starts = np.empty(n_days, dtype=np.int64)
+        weekdays = np.empty(n_days, dtype=np.int8)
+        for day in range(n_days):
+            local_date = (start_date + timedelta(days=day)).astimezone(regional_tz)
+            day_starts[day] = (
+                (local_date.toordinal() - _EPOCH_ORDINAL) * 86400 - int(local_date.utcoffset().total_seconds())
+            )
+            weekdays[day] = local_date.weekday()
 
-    def add_human_like_variance(self, scheduled_times: List[datetime]) -> List[datetime]:
+        # Use page preferences for every day if available, otherwise group the days by their hour template
+        if optimal_hours:
+            groups = [(day_starts, np.array(optimal_hours, dtype=np.int64))]
+        else:
+            weekdays_by_template: Dict[Tuple[int, ...], List[int]] = {}
+            for weekday, hours in enumerate(self._hours_by_dow[region]):
+                weekdays_by_template.setdefault(hours, []).append(weekday)
+            groups = [
+                (day_starts[np.isin(weekdays, template_weekdays)], np.array(hours, dtype=np.int64))
+                for hours, template_weekdays in weekdays_by_template.items()
+            ]
+
+        schedule = np.concatenate([
+            self._select_daily_slots(starts, hours, posts_per_day, min_interval * 3600)
+            for starts, hours in groups
+        ])
+        schedule.sort(kind="stable")  # Timsort: linear when merging the already-sorted groups
+
+        return Schedule(schedule * _SECOND_US).to_datetimes()
+
+    def _select_daily_slots(
+        self,
+        day_starts: np.ndarray,
+        hours: np.ndarray,
+        posts_per_day: int,
+        min_interval_seconds: float
+    ) -> np.ndarray:
+        """Pick posting times (UTC epoch seconds) for days that share the same optimal hours."""
+
+        # One row per day: each optimal hour with a random minute for natural variation
+        minutes = self._rng.integers(0, 60, size=(len(day_starts), len(hours)))
+        times = day_starts[:, None] + hours * 3600 + minutes * 60
+
+        # Select subset based on posts_per_day
+        if len(hours) > posts_per_day:
+            # Randomly sample to avoid predictable patterns
+            picks = np.argsort(self._rng.random(times.shape), axis=1)[:, :max(posts_per_day, 0)]
+            times = np.take_along_axis(times, picks, axis=1)
+        times.sort(axis=1)
+
+        if times.shape[1] == 0:
+            return times.ravel()
+
+        # Ensure minimum interval between posts, walking each day's slots in order
+        keep = np.ones(times.shape, dtype=np.bool_)
+        last_time = times[:, 0]
+        for slot in range(1, times.shape[1]):
+            keep[:, slot] = times[:, slot] - last_time >= min_interval_seconds
+            last_time = np.where(keep[:, slot], times[:, slot], last_time)
+
+        return times[keep]
+
+    def add_human_like_variance(
+        self,
+        scheduled_times: List[datetime],
+        now_utc: Optional[datetime] = None
+    ) -> List[datetime]:
         """Add human-like variance to scheduled posting times."""
 
-        varied_times = []
+        now = _to_us(now_utc or datetime.now(self._utc))
+        schedule = Schedule.from_datetimes(scheduled_times)
+        n = len(schedule)
 
-        for scheduled_time in scheduled_times:
-            # Add random variance: ±30 minutes
-            variance_minutes = random.randint(-30, 30)
-            varied_time = scheduled_time + timedelta(minutes=variance_minutes)
+        # Add random variance: ±30 minutes
+        varied = schedule.utc_us + self._rng.integers(-30, 31, size=n) * _MINUTE_US
 
-            # Ensure we don't go before current time
-            now_utc = datetime.now(timezone.utc)
-            if varied_time <= now_utc:
-                varied_time = now_utc + timedelta(minutes=random.randint(5, 15))
+        # Ensure we don't go before current time: those move to 5-15 minutes from now
+        fallback = now + self._rng.integers(5, 16, size=n) * _MINUTE_US
+        varied = np.where(varied <= now, fallback, varied)
+        varied.sort()
 
-            varied_times.append(varied_time)
-
-        return sorted(varied_times)
+        return Schedule(varied).to_datetimes()
 
     async def validate_posting_schedule(
         self,
         facebook_page: FacebookPage,
-        proposed_schedule: List[datetime]
+        proposed_schedule: List[datetime],
+        now_utc: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Validate a proposed posting schedule against constraints."""
 
-        now_utc = datetime.now(timezone.utc)
+        now_utc = now_utc or datetime.now(self._utc)
         validation_results = {
             "is_valid": True,
             "warnings": [],
@@ -241,64 +412,60 @@ class ContentScheduler:
             "suggested_adjustments": []
         }
 
+        regional_tz = self.regional_timezones[facebook_page.region]
+
+        # Work on the sorted timestamps
+        schedule = Schedule.from_datetimes(proposed_schedule)
+        sorted_us = np.sort(schedule.utc_us)
+        now = _to_us(now_utc)
+
+        past_count = int(np.count_nonzero(sorted_us <= now))
+        weekly_count = int(np.count_nonzero(sorted_us <= now + self._week_us))
+
+        # Posts per UTC day
+        days = sorted_us // _DAY_US
+        daily_counts = np.bincount(days - days[0]) if len(days) else days
+
+        close_count = int(np.count_nonzero(np.diff(sorted_us) < self._min_interval_us))
+
+        # Check if each time is in the optimal range
+        local_hour, local_weekday, _ = self._local_time_fields(schedule, regional_tz)
+        is_optimal = self._optimal_hour_table[facebook_page.region][local_weekday, local_hour]
+        suboptimal_count = int(np.count_nonzero(~is_optimal))
+
         # Check if any times are in the past
-        past_times = [t for t in proposed_schedule if t <= now_utc]
-        if past_times:
+        if past_count:
             validation_results["errors"].append(
-                f"{len(past_times)} scheduled times are in the past"
+                f"{past_count} scheduled times are in the past"
             )
             validation_results["is_valid"] = False
 
         # Check daily limits
-        daily_counts = {}
-        for scheduled_time in proposed_schedule:
-            date_key = scheduled_time.date()
-            daily_counts[date_key] = daily_counts.get(date_key, 0) + 1
-
-        max_daily = self.posting_limits["max_daily_posts"]
-        over_limit_days = [date for date, count in daily_counts.items() if count > max_daily]
+        max_daily = self._max_daily
+        over_limit_days = int(np.count_nonzero(daily_counts > max_daily))
 
         if over_limit_days:
             validation_results["warnings"].append(
-                f"{len(over_limit_days)} days exceed daily posting limit of {max_daily}"
+                f"{over_limit_days} days exceed daily posting limit of {max_daily}"
             )
 
         # Check minimum intervals
-        min_interval = timedelta(hours=self.posting_limits["min_interval_hours"])
-        sorted_times = sorted(proposed_schedule)
-
-        for i in range(1, len(sorted_times)):
-            if (sorted_times[i] - sorted_times[i-1]) < min_interval:
-                validation_results["warnings"].append(
-                    f"Posts scheduled too close together: {sorted_times[i-1]} and {sorted_times[i]}"
-                )
+        if close_count:
+            validation_results["warnings"].append(
+                f"{close_count} pairs of posts scheduled less than "
+                f"{self.posting_limits['min_interval_hours']} hours apart"
+            )
 
         # Check weekly limits
-        weekly_count = len([t for t in proposed_schedule if t <= now_utc + timedelta(weeks=1)])
-        if weekly_count > self.posting_limits["max_weekly_posts"]:
+        if weekly_count > self._max_weekly:
             validation_results["warnings"].append(
-                f"Weekly limit of {self.posting_limits['max_weekly_posts']} posts may be exceeded"
+                f"Weekly limit of {self._max_weekly} posts may be exceeded"
             )
 
         # Suggest optimal time adjustments
-        regional_tz = self.regional_timezones[facebook_page.region]
-        suboptimal_times = []
-
-        for scheduled_time in proposed_schedule:
-            local_time = scheduled_time.astimezone(regional_tz)
-            hour = local_time.hour
-
-            # Check if time is in optimal range
-            is_weekday = local_time.weekday() < 5
-            time_key = "weekday" if is_weekday else "weekend"
-            optimal_hours = self.optimal_posting_times[facebook_page.region][time_key]
-
-            if hour not in optimal_hours:
-                suboptimal_times.append(scheduled_time)
-
-        if suboptimal_times:
+        if suboptimal_count:
             validation_results["suggested_adjustments"].append(
-                f"{len(suboptimal_times)} posts scheduled outside optimal times"
+                f"{suboptimal_count} posts scheduled outside optimal times"
             )
 
         return validation_results
@@ -315,40 +482,57 @@ class ContentScheduler:
             # Use default optimal times if no historical data
             return base_schedule
 
-        # Sort hours by performance score
-        sorted_hours = sorted(
-            historical_performance.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
+        # Get top performing hours: partition out the best 5 scores, then order just those (ties by input order)
+        hours = np.fromiter(historical_performance.keys(), dtype=np.int64, count=len(historical_performance))
+        scores = np.fromiter(historical_performance.values(), dtype=np.float64, count=len(historical_performance))
+        top_count = min(5, len(scores))
+        if top_count < len(scores):
+            top_idx = np.argpartition(-scores, top_count - 1)[:top_count]
+        else:
+            top_idx = np.arange(len(scores))
+        top_idx = top_idx[np.lexsort((top_idx, -scores[top_idx]))]
+
+        top_hours = hours[top_idx].tolist()
 
-        # Get top performing hours
-        top_hours = [hour for hour, _ in sorted_hours[:5]]
+        # Nearest top performing hour for each hour of the day (ties go to the better-scored hour)
+        closest_hour = np.array([min(top_hours, key=lambda h: abs(h - hour)) for hour in range(24)])
 
         # Adjust schedule to favor high-performing hours
-        optimized_schedule = []
         regional_tz = self.regional_timezones[region]
+        schedule = Schedule.from_datetimes(base_schedule)
+        current_hour, _, current_minute = self._local_time_fields(schedule, regional_tz)
+        minutes = self._rng.integers(0, 60, size=len(schedule))
+
+        # Times outside the top hours move to the nearest one at a random minute, keeping the same UTC offset
+        shift = (closest_hour[current_hour] - current_hour) * _HOUR_US + (minutes - current_minute) * _MINUTE_US
+        optimized = schedule.utc_us + np.where(np.isin(current_hour, top_hours), 0, shift)
+        optimized.sort()
+
+        return Schedule(optimized).to_datetimes()
+
+    def _local_time_fields(
+        self,
+        schedule: Schedule,
+        regional_tz: pytz.BaseTzInfo
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Local (hour, weekday, minute) of each scheduled time in regional_tz."""
+
+        table = _tz_transitions(regional_tz)
+        if table is not None:
+            # Offset in effect at each time: the last transition at or before it, as pytz itself resolves it
+            transitions, offsets = table
+            idx = np.searchsorted(transitions, schedule.utc_us, side="right") - 1
+            local_us = schedule.utc_us + offsets[np.maximum(idx, 0)]
+        else:
+            # No usable transition table: convert each time individually
+            local_us = schedule.utc_us + np.fromiter(
+                (t.astimezone(regional_tz).utcoffset() // _MICROSECOND for t in schedule.to_datetimes()),
+                dtype=np.int64,
+                count=len(schedule)
+            )
 
-        for scheduled_time in base_schedule:
-            local_time = scheduled_time.astimezone(regional_tz)
-            current_hour = local_time.hour
-
-            # If current hour is not in top performers, try to adjust
-            if current_hour not in top_hours and top_hours:
-                # Find nearest top performing hour
-                closest_hour = min(top_hours, key=lambda h: abs(h - current_hour))
-
-                # Create new time with optimized hour
-                optimized_local_time = local_time.replace(
-                    hour=closest_hour,
-                    minute=random.randint(0, 59)
-                )
-                optimized_utc_time = optimized_local_time.astimezone(timezone.utc)
-                optimized_schedule.append(optimized_utc_time)
-            else:
-                optimized_schedule.append(scheduled_time)
-
-        return sorted(optimized_schedule)
+        local_minutes = local_us // _MINUTE_US
+        return (local_minutes // 60) % 24, (local_minutes // 1440 + 3) % 7, local_minutes % 60  # Epoch was a Thursday
 
     def calculate_posting_frequency(
         self,
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import facebook_api
+from app.services.facebook_api import FacebookAPIManager, close_graph_client
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_bucket_is_shared_across_managers(monkeypatch):
+    monkeypatch.setattr(facebook_api, "_GRAPH_CALLS_PER_HOUR", 2)
+
+    first, second = FacebookAPIManager(), FacebookAPIManager()
+    await first._check_rate_limits()
+    await first.close()
+    await second._check_rate_limits()
+
+    # Both tokens are spent, whichever manager asks next
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(FacebookAPIManager()._check_rate_limits(), timeout=0.05)
+
+    refill_task = facebook_api._rate_limit_refill_task
+    assert not refill_task.done()
+
+    await close_graph_client()
+    assert refill_task.cancelled()
+    assert facebook_api._rate_limit_tokens is None
+
+
+def mock_manager(handler):
+    manager = FacebookAPIManager()
+    manager.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_post_photo_uploads_image_bytes_as_source():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "photo_1", "post_id": "123_456"})
+
+    manager = mock_manager(handler)
+    result = await manager._post_photo(
+        "123", {"access_token": "token", "message": "Hello"}, "https://example.com/image.jpg",
+        image_bytes=b"\xff\xd8jpeg-bytes"
+    )
+    await manager.client.aclose()
+
+    request, = requests
+    body = request.read()
+    assert request.url.path.endswith("/123/photos")
+    assert request.headers["content-type"].startswith("multipart/form-data")
+    assert b'name="source"; filename="image.jpg"' in body
+    assert b"\xff\xd8jpeg-bytes" in body
+    assert b'name="message"' in body
+    assert b'name="url"' not in body
+    assert result["post_id"] == "123_456"
+
+
+@pytest.mark.asyncio
+async def test_post_photo_without_bytes_sends_url():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"id": "photo_1"})
+
+    manager = mock_manager(handler)
+    await manager._post_photo("123", {"access_token": "token"}, "https://example.com/image.jpg")
+    await manager.client.aclose()
+
+    request, = requests
+    assert request.headers["content-type"] == "application/x-www-form-urlencoded"
+    assert b"url=https%3A%2F%2Fexample.com%2Fimage.jpg" in request.read()
+
+
+class DecodeOnceResponse(httpx.Response):
+    """Response whose json() and text fail, so the body can only be read through content."""
+
+    def json(self, **kwargs):
+        raise AssertionError("json() re-decodes the body")
+
+    @property
+    def text(self):
+        raise AssertionError("text re-decodes the body")
+
+
+@pytest.mark.parametrize("content, expected", [
+    (b'{"error": {"message": "Invalid OAuth access token", "code": 190}}', "Invalid OAuth access token"),
+    (b'{"error": {"code": 1}}', '{"error": {"code": 1}}'),
+    (b"<html>Bad Gateway</html>", "<html>Bad Gateway</html>"),
+    (b"", "Unknown error")
+])
+def test_error_message_decodes_body_once(monkeypatch, content, expected):
+    loads_calls = []
+    real_loads = facebook_api.json.loads
+
+    def counting_loads(raw):
+        loads_calls.append(raw)
+        return real_loads(raw)
+
+    monkeypatch.setattr(facebook_api.json, "loads", counting_loads)
+
+    message = FacebookAPIManager()._error_message(DecodeOnceResponse(400, content=content))
+
+    assert message == expected
+    assert len(loads_calls) == (1 if content else 0)
@@ -0,0 +1,207 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.services.optimization import ContentOptimizationEngine
+
+
+def make_posts(count, seed=0, image_url="https://example.com/image.jpg"):
+    rng = random.Random(seed)
+    posts = []
+    for _ in range(count):
+        posts.append({
+            "scheduled_post": {
+                "actual_posted_time": f"2024-05-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z"
+            },
+            "content_generation": {
+                "generated_caption": " ".join(["hello"] * rng.randint(1, 40)) + " #usa",
+                "generated_image_url": image_url,
+                "sentiment_score": rng.uniform(-1, 1),
+                "readability_score": rng.uniform(0, 100)
+            },
+            "analytics": {
+                "impressions": rng.randint(100, 1000),
+                "reach": rng.randint(50, 500),
+                "engaged_users": rng.randint(0, 50),
+                "clicks": rng.randint(0, 30),
+                "likes": rng.randint(0, 40),
+                "comments": rng.randint(0, 10),
+                "shares": rng.randint(0, 5),
+                "performance_score": 0.5
+            }
+        })
+    return posts
+
+
+@pytest.mark.asyncio
+async def test_analyze_content_performance_all_image_posts():
+    engine = ContentOptimizationEngine()
+
+    result = await engine.analyze_content_performance(1, make_posts(30))
+
+    image_impact = result["content_analysis"]["image_impact"]
+    assert image_impact["without_image"] == {"avg_engagement": 0, "post_count": 0}
+    assert image_impact["with_image"]["post_count"] == 30
+    assert all(rec["type"] != "visual_content" for rec in result["optimization_recommendations"])
+
+
+def training_data(engine, count=60, seed=0):
+    posts = make_posts(count, seed=seed)
+    features = [engine._extract_content_features(post) for post in posts]
+    metrics = [engine._extract_performance_metrics(post) for post in posts]
+    return features, metrics
+
+
+@pytest.fixture
+def model_state_dir(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.services import optimization
+
+    monkeypatch.setattr(settings, "MODEL_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(optimization, "_model_state_cache", {})
+    return tmp_path
+
+
+@pytest.mark.asyncio
+async def test_model_state_is_kept_per_page(model_state_dir):
+    from app.models.models import RegionEnum
+    from app.services import optimization
+
+    trained = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await trained.train_predictive_models(*training_data(trained))
+    assert [p.name for p in model_state_dir.iterdir()] == ["page_1_us.npz"]
+
+    # A fresh process reads the file back; other pages and regions stay untrained
+    optimization._model_state_cache.clear()
+    same_page = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    other_page = ContentOptimizationEngine(page_id=2, region=RegionEnum.US)
+    other_region = ContentOptimizationEngine(page_id=1, region=RegionEnum.UK)
+    for engine in (same_page, other_page, other_region):
+        await engine.load_model_state()
+
+    features = training_data(trained, count=1, seed=1)[0][0]
+    assert same_page.predict_content_performance(features) == trained.predict_content_performance(features)
+    for engine in (other_page, other_region):
+        with pytest.raises(ValueError):
+            engine._predict_batch(engine._features_to_raw_array([features]))
+
+
+@pytest.mark.asyncio
+async def test_model_state_not_persisted_without_page(model_state_dir):
+    engine = ContentOptimizationEngine()
+    await engine.train_predictive_models(*training_data(engine))
+
+    assert list(model_state_dir.iterdir()) == []
+
+
+def test_solve_ridge_matches_standardized_ridge():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 8)) * rng.uniform(0.1, 10, size=8) + rng.normal(size=8)
+    X[:, 3] = 2.5  # Constant column
+    y = rng.normal(size=(200, 3))
+
+    A = np.hstack([X, np.ones((len(X), 1))])
+    engine = ContentOptimizationEngine()
+    mean, scale, coef, intercept = engine._solve_ridge(A.T @ A, A.T @ y)
+
+    # Reference: StandardScaler (unit scale for constant columns) followed by Ridge with an intercept
+    expected_scale = X.std(axis=0)
+    expected_scale[3] = 1.0
+    X_scaled = (X - X.mean(axis=0)) / expected_scale
+    expected_coef = np.linalg.solve(
+        X_scaled.T @ X_scaled + engine.ridge_alpha * np.eye(8), X_scaled.T @ (y - y.mean(axis=0))
+    ).T
+
+    np.testing.assert_allclose(mean, X.mean(axis=0), atol=1e-9)
+    np.testing.assert_allclose(scale, expected_scale, rtol=1e-9)
+    np.testing.assert_allclose(coef, expected_coef, atol=1e-7)
+    np.testing.assert_allclose(intercept, y.mean(axis=0), atol=1e-9)
+
+
+@pytest.mark.asyncio
+async def test_retraining_fits_from_scratch_unless_incremental():
+    engine = ContentOptimizationEngine()
+    features, metrics = training_data(engine)
+    split = int(len(features) * 0.8)
+
+    await engine.train_predictive_models(features, metrics)
+    coef = engine._coef.copy()
+    await engine.train_predictive_models(features, metrics)
+    assert engine._gram[8, 8] == split
+    np.testing.assert_array_equal(engine._coef, coef)
+
+    await engine.train_predictive_models(features, metrics, incremental=True)
+    assert engine._gram[8, 8] == 2 * split
+
+
+@pytest.mark.asyncio
+async def test_model_state_written_by_another_worker_is_loaded(model_state_dir):
+    from app.models.models import RegionEnum
+    from app.services import optimization
+
+    features, metrics = training_data(ContentOptimizationEngine())
+    probe = features[0]
+
+    # Nothing saved yet: the miss must not stick
+    reader = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await reader.load_model_state()
+    assert reader._coef is None
+
+    # Another worker trains; this process's cache knows nothing about it
+    first = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await first.train_predictive_models(features[:40], metrics[:40])
+    optimization._model_state_cache.clear()
+
+    reader = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await reader.load_model_state()
+    assert reader.predict_content_performance(probe) == first.predict_content_performance(probe)
+    stale_cache = dict(optimization._model_state_cache)
+
+    # A later retrain by another worker replaces the file this process has cached
+    second = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await second.train_predictive_models(features, metrics)
+    optimization._model_state_cache.clear()
+    optimization._model_state_cache.update(stale_cache)
+
+    reader = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await reader.load_model_state()
+    assert reader.predict_content_performance(probe) == second.predict_content_performance(probe)
+
+
+@pytest.mark.asyncio
+async def test_incremental_training_adds_to_persisted_state(model_state_dir):
+    from app.models.models import RegionEnum
+
+    features, metrics = training_data(ContentOptimizationEngine())
+    split = int(len(features) * 0.8)
+
+    await ContentOptimizationEngine(page_id=1, region=RegionEnum.US).train_predictive_models(features, metrics)
+
+    # A fresh engine that never loaded the page's state still builds on it
+    engine = ContentOptimizationEngine(page_id=1, region=RegionEnum.US)
+    await engine.train_predictive_models(features, metrics, incremental=True)
+    assert engine._gram[8, 8] == 2 * split
+
+    saved = np.load(model_state_dir / "page_1_us.npz")
+    assert saved["gram"][8, 8] == 2 * split
+
+
+def test_parse_posting_times_rejects_out_of_range_fields():
+    engine = ContentOptimizationEngine()
+    times = [
+        "2024-05-03T12:30:00Z",
+        "2024-05-03T12:99:00",
+        "2024-05-03T24:00:00",
+        "2024-05-03T12:30:60",
+        "2024-05-03T12:30:00+24:00",
+        "0000-01-01T12:00:00",
+        "2024-05-03T07",
+        None
+    ]
+
+    hour, weekday, parsed = engine._parse_posting_times(times)
+
+    assert parsed.tolist() == [True, False, False, False, False, False, True, True]
+    assert (int(hour[0]), int(weekday[0])) == (12, 4)
+    assert (int(hour[6]), int(weekday[6])) == (7, 4)
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytz
+
+from app.services import scheduler
+from app.services.scheduler import ContentScheduler, Schedule
+
+ZONES = ["America/New_York", "Europe/London", "Australia/Lord_Howe", "Asia/Kolkata", "Etc/GMT+5", "UTC"]
+
+
+def times_around_transitions():
+    """Every quarter hour from a day before to a day after each 2024 DST change in New York and London."""
+    changes = [
+        datetime(2024, 3, 10, 7, tzinfo=timezone.utc),
+        datetime(2024, 3, 31, 1, tzinfo=timezone.utc),
+        datetime(2024, 10, 27, 1, tzinfo=timezone.utc),
+        datetime(2024, 11, 3, 6, tzinfo=timezone.utc)
+    ]
+    times = []
+    for change in changes:
+        times.extend(change + timedelta(minutes=15 * step) for step in range(-96, 97))
+        times.extend([change - timedelta(microseconds=1), change + timedelta(microseconds=1)])
+    return times
+
+
+def expected_fields(times, tz):
+    local_times = [t.astimezone(tz) for t in times]
+    return (
+        [t.hour for t in local_times],
+        [t.weekday() for t in local_times],
+        [t.minute for t in local_times]
+    )
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_local_time_fields_match_astimezone(zone):
+    tz = pytz.timezone(zone)
+    times = times_around_transitions()
+
+    hour, weekday, minute = ContentScheduler()._local_time_fields(Schedule.from_datetimes(times), tz)
+
+    assert (hour.tolist(), weekday.tolist(), minute.tolist()) == expected_fields(times, tz)
+
+
+def test_local_time_fields_without_transition_table(monkeypatch):
+    monkeypatch.setattr(scheduler, "_tz_transitions", lambda tz: None)
+    tz = pytz.timezone("America/New_York")
+    times = times_around_transitions()
+
+    hour, weekday, minute = ContentScheduler()._local_time_fields(Schedule.from_datetimes(times), tz)
+
+    assert (hour.tolist(), weekday.tolist(), minute.tolist()) == expected_fields(times, tz)